@@ -0,0 +1,296 @@
+# bench_pipeline.py
+# Reproducible benchmarks for the recommendation pipeline.
+#
+#   python -m benchmarks.bench_pipeline --scales 1 10 100 --output bench.json
+#   python -m benchmarks.bench_pipeline --baseline bench.json --threshold 0.2 --min-delta-ms 1
+#
+# Runs /recommendation end to end through Flask's test client and each stage on
+# its own, against synthetic project inputs and material / glass catalogs scaled
+# by repeating and jittering the real datasets.
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import warnings
+from contextlib import contextmanager
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DATASET_PATH = os.path.join(REPO_ROOT, 'dataset', 'facade_material_dataset.csv')
+
+# Project categorical inputs; their choices are the values seen in the dataset
+CATEGORICAL_COLS = [
+    'location', 'building_type', 'orientation', 'budget_level',
+    'acoustic_requirement', 'fire_rating_requirement', 'aesthetic_preference',
+    'thermal_insulation_required', 'wind_load_level', 'climate_zone', 'solar_exposure'
+]
+
+NUMERIC_RANGES = {
+    'floor_count': (1, 40),
+    'facade_area_sqm': (200, 5000),
+    'max_cost_per_sqm': (50, 300),
+    'required_u_value': (0.8, 3.0),
+    'required_shgc': (0.2, 0.7),
+    'required_vlt': (20, 80),
+    'avg_temp_c': (5, 40),
+    'avg_humidity_pct': (20, 95),
+    'avg_rainfall_mm': (100, 3000)
+}
+
+# Material / glass numeric columns that are jittered when scaling a catalog
+MATERIAL_JITTER_COLS = [
+    'cost_per_sqm', 'installation_cost_per_sqm', 'material_u_value',
+    'material_shgc', 'material_vlt_percent', 'durability_years'
+]
+GLASS_JITTER_COLS = ['u_value', 'shgc', 'vlt', 'cost_per_sqm', 'durability_years']
+
+
+# -----------------------------
+# SYNTHETIC DATA
+# -----------------------------
+@lru_cache(maxsize=None)
+def categorical_choices(path=DATASET_PATH):
+    """Sorted, lowercased unique values of each categorical input in the dataset."""
+    df = pd.read_csv(path, usecols=CATEGORICAL_COLS)
+    return {col: sorted(df[col].dropna().astype(str).str.lower().unique())
+            for col in CATEGORICAL_COLS}
+
+
+def synthetic_projects(n, seed=0):
+    """Generate n random but valid project inputs (already parsed/lowercased)."""
+    choices = categorical_choices()
+    rng = np.random.default_rng(seed)
+    projects = []
+    for _ in range(n):
+        project = {key: str(rng.choice(values)) for key, values in choices.items()}
+        for key, (low, high) in NUMERIC_RANGES.items():
+            project[key] = round(float(rng.uniform(low, high)), 2)
+        projects.append(project)
+    return projects
+
+
+def scale_catalog(df, factor, jitter_cols, id_col=None, seed=0):
+    """Repeat a catalog `factor` times, jittering numeric columns by +/-5% per copy."""
+    if factor == 1:
+        return df.copy()
+
+    rng = np.random.default_rng(seed)
+    copies = []
+    for i in range(factor):
+        copy = df.copy()
+        if i > 0:
+            for col in jitter_cols:
+                copy[col] = copy[col] * rng.uniform(0.95, 1.05, size=len(copy))
+            if id_col:
+                copy[id_col] = copy[id_col].astype(str) + f"_x{i}"
+        copies.append(copy)
+    return pd.concat(copies, ignore_index=True)
+
+
+# -----------------------------
+# TIMING
+# -----------------------------
+def measure(fn, repeat, warmup=1):
+    """Run fn warmup + repeat times; return timing stats in milliseconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return {
+        'repeat': repeat,
+        'mean_ms': statistics.fmean(samples),
+        'median_ms': statistics.median(samples),
+        'min_ms': min(samples),
+        'max_ms': max(samples)
+    }
+
+
+@contextmanager
+def preserve_file(path):
+    """Restore `path` to its current contents after the block (the app rewrites its PDF)."""
+    original = None
+    if os.path.exists(path):
+        with open(path, 'rb') as f:
+            original = f.read()
+    try:
+        yield
+    finally:
+        if original is not None:
+            with open(path, 'wb') as f:
+                f.write(original)
+
+
+@contextmanager
+def scaled_app(main, glass_module, scale, workdir):
+    """Point the loaded app at catalogs scaled by `scale` for the duration of the block."""
+    original_db = main.material_db
+    original_glass = glass_module.GLASS_DATASET_PATH
+
+    glass_path = os.path.join(workdir, f"glass_x{scale}.csv")
+    glass_df = scale_catalog(pd.read_csv(original_glass), scale, GLASS_JITTER_COLS)
+    glass_df.to_csv(glass_path, index=False)
+
+    main.material_db = scale_catalog(original_db, scale, MATERIAL_JITTER_COLS, id_col='material_id')
+    glass_module.GLASS_DATASET_PATH = glass_path
+    try:
+        yield
+    finally:
+        main.material_db = original_db
+        glass_module.GLASS_DATASET_PATH = original_glass
+
+
+def bench_scale(main, scale, repeat, workdir):
+    """Benchmark the full request and each stage at one catalog scale."""
+    from model_training import glass_recommendation
+    from model_training.batch_inference import build_material_frame, unique_material_rows
+    from model_training.preprocessing import preprocess_input
+    from visualization.charts import bar_chart_top_materials, scatter_cost_vs_thermal
+    from visualization.multi_material_chart import multi_material_comparison_chart
+    from visualization.pdf_export import export_recommendations_pdf
+
+    project = synthetic_projects(1, seed=scale)[0]
+    results = {}
+
+    with scaled_app(main, glass_recommendation, scale, workdir):
+        client = main.app.test_client()
+        results['request_recommendation'] = measure(
+            lambda: client.get('/recommendation', query_string=project), repeat
+        )
+        results['request_api_recommendation'] = measure(
+            lambda: client.get('/api/recommendation', query_string=project), repeat
+        )
+
+        models = main.model_registry.current()
+        df = build_material_frame([project], unique_material_rows(main.material_db)[0])
+        results['preprocess'] = measure(
+            lambda: preprocess_input(df.copy(), models.preprocessor), repeat
+        )
+        X_proc = preprocess_input(df.copy(), models.preprocessor)
+        for name in ('suitability', 'thermal', 'cost'):
+            model = getattr(models, f"{name}_model")
+            results[f"predict_{name}"] = measure(lambda: model.predict(X_proc), repeat)
+
+        results['glass_ranking'] = measure(
+            lambda: glass_recommendation.get_top_glass_materials(top_n=5), repeat
+        )
+
+        result = main.score_project(project)
+        preds, top = result['preds'], result['top_materials']
+        results['chart_bar'] = measure(lambda: bar_chart_top_materials(top), repeat)
+        results['chart_scatter'] = measure(
+            lambda: scatter_cost_vs_thermal(preds, pareto_front=result['pareto_front']), repeat
+        )
+        results['chart_multi'] = measure(lambda: multi_material_comparison_chart(top), repeat)
+
+        glass = glass_recommendation.get_top_glass_materials(top_n=5).to_dict(orient='records')
+        # Render the chart once so pdf_export times only the PDF; it rewinds the buffer per call
+        chart_img = multi_material_comparison_chart(top)
+        pdf_path = os.path.join(workdir, 'bench.pdf')
+        results['pdf_export'] = measure(
+            lambda: export_recommendations_pdf(
+                top_materials=top,
+                suitability_score=round(top[0]['score'], 2),
+                thermal_perf=round(top[0]['thermal'], 2),
+                cost_est=round(top[0]['cost'], 2),
+                glass_recommendations=glass,
+                chart_img=chart_img,
+                output_path=pdf_path
+            ),
+            repeat
+        )
+
+        results['catalog_size'] = {'materials': len(main.material_db)}
+
+    return results
+
+
+# -----------------------------
+# BASELINE COMPARISON
+# -----------------------------
+def compare(current, baseline, threshold, min_delta_ms=1.0):
+    """
+    Compare median timings against a baseline run.
+
+    A benchmark regresses only if its median is both more than `threshold`
+    slower relatively and more than `min_delta_ms` slower in absolute terms,
+    so sub-millisecond stages don't fail on timer noise. Baselines with a
+    zero median are skipped.
+    Returns a list of (scale, benchmark, baseline_ms, current_ms, ratio) regressions.
+    """
+    regressions = []
+    for scale, benches in current['results'].items():
+        for name, stats in benches.items():
+            base = baseline.get('results', {}).get(scale, {}).get(name)
+            if not base or 'median_ms' not in stats or base.get('median_ms', 0) <= 0:
+                continue
+            delta = stats['median_ms'] - base['median_ms']
+            ratio = stats['median_ms'] / base['median_ms']
+            if ratio > 1 + threshold and delta > min_delta_ms:
+                regressions.append((scale, name, base['median_ms'], stats['median_ms'], ratio))
+    return regressions
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the recommendation pipeline")
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100],
+                        help="Catalog scale factors (default: 1 10 100)")
+    parser.add_argument('--repeat', type=int, default=5, help="Timed runs per benchmark")
+    parser.add_argument('--output', help="Write results JSON to this path")
+    parser.add_argument('--baseline', help="Baseline results JSON to compare against")
+    parser.add_argument('--threshold', type=float, default=0.2,
+                        help="Allowed slowdown vs baseline before failing (default: 0.2 = 20%%)")
+    parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                        help="Ignore slowdowns smaller than this many ms (default: 1.0)")
+    args = parser.parse_args(argv)
+
+    # main.py loads models and datasets with paths relative to the repo root
+    os.chdir(REPO_ROOT)
+    sys.path.insert(0, REPO_ROOT)
+    warnings.filterwarnings("ignore")
+    import main
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'repeat': args.repeat,
+        'results': {}
+    }
+    # Keep /recommendation from leaving the tracked static PDF modified
+    with tempfile.TemporaryDirectory() as workdir, preserve_file('static/recommendation.pdf'):
+        for scale in args.scales:
+            print(f"[INFO] Benchmarking catalog scale x{scale}...")
+            report['results'][str(scale)] = bench_scale(main, scale, args.repeat, workdir)
+
+    output = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"[INFO] Results saved at {args.output}")
+    else:
+        print(output)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.threshold, args.min_delta_ms)
+        for scale, name, base_ms, cur_ms, ratio in regressions:
+            print(f"[REGRESSION] x{scale} {name}: {base_ms:.1f} ms -> {cur_ms:.1f} ms ({ratio:.2f}x)")
+        if regressions:
+            return 1
+        print(f"[INFO] No regressions beyond {args.threshold:.0%} / {args.min_delta_ms} ms vs {args.baseline}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
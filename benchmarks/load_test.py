@@ -0,0 +1,301 @@
+# load_test.py
+# Local load test: starts the app under gunicorn with each requested worker class
+# and replays a mix of /recommendation, /download_pdf and form POST traffic.
+#
+#   python -m benchmarks.load_test --worker-classes sync gthread gevent \
+#       --workers 2 --concurrency 8 --duration 30 --output load.json
+#
+# Reports throughput, latency percentiles, error rate and per-worker RSS
+# (RSS is read from /proc, so Linux only).
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import socket
+import subprocess
+import sys
+import threading
+import time
+from urllib.parse import urlencode
+
+import numpy as np
+
+from benchmarks.bench_pipeline import REPO_ROOT, preserve_file, synthetic_projects
+
+# Relative weight of each request kind in the replayed traffic
+DEFAULT_MIX = {'recommendation': 0.6, 'download_pdf': 0.2, 'form_post': 0.2}
+STARTUP_TIMEOUT = 120
+RSS_SAMPLE_INTERVAL = 0.5
+
+
+# -----------------------------
+# SERVER PROCESS
+# -----------------------------
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+def start_server(worker_class, workers, threads, port):
+    """Start gunicorn serving main:app and wait until it accepts requests."""
+    cmd = [
+        sys.executable, '-m', 'gunicorn', 'main:app',
+        '--bind', f'127.0.0.1:{port}',
+        '--workers', str(workers),
+        '--worker-class', worker_class,
+        '--timeout', '120',
+        '--log-level', 'warning'
+    ]
+    if worker_class == 'gthread':
+        cmd += ['--threads', str(threads)]
+    elif worker_class == 'gevent':
+        cmd += ['--worker-connections', str(max(threads, 100))]
+
+    proc = subprocess.Popen(cmd, cwd=REPO_ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE)
+
+    deadline = time.time() + STARTUP_TIMEOUT
+    while time.time() < deadline:
+        if proc.poll() is not None:
+            raise RuntimeError(f"gunicorn exited early: {proc.stderr.read().decode()[-2000:]}")
+        try:
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+            conn.request('GET', '/')
+            conn.getresponse().read()
+            conn.close()
+            return proc
+        except OSError:
+            time.sleep(0.5)
+
+    stop_server(proc)
+    raise RuntimeError(f"gunicorn did not start within {STARTUP_TIMEOUT}s")
+
+
+def stop_server(proc):
+    if proc.poll() is None:
+        proc.send_signal(signal.SIGTERM)
+        try:
+            proc.wait(timeout=30)
+        except subprocess.TimeoutExpired:
+            proc.kill()
+            proc.wait()
+
+
+def worker_pids(master_pid):
+    """PIDs of the gunicorn worker processes forked by master_pid."""
+    pids = []
+    for entry in os.listdir('/proc'):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry}/stat') as f:
+                # Field 4 is the parent PID; the command name (field 2) may contain spaces
+                ppid = int(f.read().rsplit(')', 1)[1].split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+        if ppid == master_pid:
+            pids.append(int(entry))
+    return pids
+
+
+def rss_mb(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return None
+
+
+class RssSampler(threading.Thread):
+    """Samples worker RSS in the background and keeps the peak per worker."""
+
+    def __init__(self, master_pid):
+        super().__init__(daemon=True)
+        self.master_pid = master_pid
+        self.peak = {}
+        self.last = {}
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            for pid in worker_pids(self.master_pid):
+                rss = rss_mb(pid)
+                if rss is not None:
+                    self.last[pid] = rss
+                    self.peak[pid] = max(self.peak.get(pid, 0), rss)
+            self._stop_event.wait(RSS_SAMPLE_INTERVAL)
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+
+# -----------------------------
+# TRAFFIC
+# -----------------------------
+def build_request(kind, project):
+    """Return (method, path, body, headers) for one request of the given kind."""
+    if kind == 'recommendation':
+        return 'GET', '/recommendation?' + urlencode(project), None, {}
+    if kind == 'download_pdf':
+        return 'GET', '/download_pdf', None, {}
+    if kind == 'form_post':
+        headers = {'Content-Type': 'application/x-www-form-urlencoded'}
+        return 'POST', '/', urlencode(project), headers
+    raise ValueError(f"Unknown request kind: {kind}")
+
+
+def run_client(port, deadline, mix, projects, seed, records):
+    """One client loop: pick a request kind by weight, send it, record the outcome."""
+    rng = random.Random(seed)
+    kinds, weights = zip(*mix.items())
+    while time.time() < deadline:
+        kind = rng.choices(kinds, weights)[0]
+        method, path, body, headers = build_request(kind, rng.choice(projects))
+        start = time.perf_counter()
+        try:
+            # Redirects are not followed, so a form POST measures only the POST itself
+            conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+            conn.request(method, path, body=body, headers=headers)
+            response = conn.getresponse()
+            response.read()
+            conn.close()
+            ok = response.status < 400
+        except OSError:
+            ok = False
+        records.append((kind, time.perf_counter() - start, ok))
+
+
+def summarize(records, elapsed):
+    def stats(latencies, errors, total):
+        latencies_ms = np.array(latencies) * 1000
+        return {
+            'requests': total,
+            'throughput_rps': total / elapsed,
+            'error_rate': errors / total if total else 0.0,
+            'p50_ms': float(np.percentile(latencies_ms, 50)) if total else None,
+            'p95_ms': float(np.percentile(latencies_ms, 95)) if total else None,
+            'p99_ms': float(np.percentile(latencies_ms, 99)) if total else None,
+            'max_ms': float(latencies_ms.max()) if total else None
+        }
+
+    summary = {'overall': stats([r[1] for r in records], sum(not r[2] for r in records), len(records))}
+    for kind in sorted({r[0] for r in records}):
+        subset = [r for r in records if r[0] == kind]
+        summary[kind] = stats([r[1] for r in subset], sum(not r[2] for r in subset), len(subset))
+    return summary
+
+
+def warm_up(port, projects, n):
+    """
+    Send n /recommendation requests at once. Sent one after another they would
+    usually all land on the same idle worker; in parallel each busy worker
+    leaves the next request to another, so every worker pays its first-request
+    cost (matplotlib, model caches) here instead of in the measured run.
+    """
+    def send(project):
+        conn = http.client.HTTPConnection('127.0.0.1', port, timeout=120)
+        conn.request('GET', '/recommendation?' + urlencode(project))
+        conn.getresponse().read()
+        conn.close()
+
+    senders = [threading.Thread(target=send, args=(projects[i % len(projects)],)) for i in range(n)]
+    for t in senders:
+        t.start()
+    for t in senders:
+        t.join()
+
+
+def run_load_test(worker_class, workers, threads, concurrency, duration, mix, warmup=1):
+    port = free_port()
+    proc = start_server(worker_class, workers, threads, port)
+    try:
+        projects = synthetic_projects(50)
+
+        # Warm every worker with concurrent rounds at least as wide as the measured load
+        for _ in range(warmup):
+            warm_up(port, projects, max(workers, concurrency))
+
+        sampler = RssSampler(proc.pid)
+        sampler.start()
+
+        records = []
+        deadline = time.time() + duration
+        start = time.time()
+        clients = [
+            threading.Thread(target=run_client, args=(port, deadline, mix, projects, i, records))
+            for i in range(concurrency)
+        ]
+        for t in clients:
+            t.start()
+        for t in clients:
+            t.join()
+        elapsed = time.time() - start
+
+        sampler.stop()
+    finally:
+        stop_server(proc)
+
+    return {
+        'worker_class': worker_class,
+        'workers': workers,
+        'threads': threads if worker_class == 'gthread' else 1,
+        'concurrency': concurrency,
+        'duration_s': elapsed,
+        'latency': summarize(records, elapsed),
+        'worker_rss_mb': {
+            'peak': sorted(sampler.peak.values()),
+            'last': sorted(sampler.last.values())
+        }
+    }
+
+
+def print_report(result):
+    o = result['latency']['overall']
+    rss = result['worker_rss_mb']['peak']
+    print(f"{result['worker_class']:>8} w={result['workers']} t={result['threads']} "
+          f"c={result['concurrency']}: {o['throughput_rps']:.2f} req/s, "
+          f"p50 {o['p50_ms'] or 0:.0f} ms, p95 {o['p95_ms'] or 0:.0f} ms, "
+          f"p99 {o['p99_ms'] or 0:.0f} ms, errors {o['error_rate']:.1%}, "
+          f"peak RSS/worker {', '.join(f'{r:.0f}' for r in rss)} MB")
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Load test the app under gunicorn worker models")
+    parser.add_argument('--worker-classes', nargs='+', default=['sync', 'gthread', 'gevent'],
+                        help="gunicorn worker classes to compare (default: sync gthread gevent)")
+    parser.add_argument('--workers', type=int, default=2, help="gunicorn worker processes")
+    parser.add_argument('--threads', type=int, default=4, help="Threads per gthread worker")
+    parser.add_argument('--concurrency', type=int, default=8, help="Concurrent client connections")
+    parser.add_argument('--duration', type=float, default=30, help="Seconds of load per worker class")
+    parser.add_argument('--mix', type=json.loads, default=DEFAULT_MIX,
+                        help=f"Request mix weights as JSON (default: {json.dumps(DEFAULT_MIX)})")
+    parser.add_argument('--output', help="Write results JSON to this path")
+    args = parser.parse_args(argv)
+
+    for kind in args.mix:
+        build_request(kind, {})
+
+    results = []
+    with preserve_file(os.path.join(REPO_ROOT, 'static', 'recommendation.pdf')):
+        for worker_class in args.worker_classes:
+            print(f"[INFO] Load testing gunicorn worker class '{worker_class}'...")
+            result = run_load_test(worker_class, args.workers, args.threads,
+                                   args.concurrency, args.duration, args.mix)
+            print_report(result)
+            results.append(result)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump({'mix': args.mix, 'results': results}, f, indent=2)
+        print(f"[INFO] Results saved at {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -1,28 +1,42 @@
-import pandas as pd
+import numpy as np
 import os
-import joblib
 import base64
-from io import BytesIO
-from flask import Flask, request, render_template, redirect, url_for, send_file
+from flask import Flask, request, render_template, redirect, url_for, send_file, jsonify, Response
 
-from model_training.preprocessing import preprocess_input
+from model_training.batch_inference import MATERIAL_FEATURES, predict_materials, sensitivity_sweep
+from model_training.pareto import material_pareto_fronts
+from model_training.registry import ModelRegistry
+from model_training.dataset_cache import load_csv_cached
+from reports import jobs
 from visualization.charts import bar_chart_top_materials, scatter_cost_vs_thermal
 from visualization.multi_material_chart import multi_material_comparison_chart
 from visualization.pdf_export import export_recommendations_pdf
 from model_training.glass_recommendation import get_top_glass_materials
+from monitoring.timing import (
+    timed, start_request, request_spans, server_timing_header, render_prometheus
+)
 
 app = Flask(__name__)
 
+# Add a Server-Timing header with per-stage durations to every response
+app.config['SERVER_TIMING'] = os.environ.get('SERVER_TIMING', '0') == '1'
+
+# Load material database (columnar cache, see model_training/dataset_cache.py)
+material_db = load_csv_cached('dataset/facade_material_dataset.csv')
+
 # -----------------------------
 # Load preprocessor and models
 # -----------------------------
-preprocessor = joblib.load('models_pkl/preprocessor.pkl')
-suitability_model = joblib.load('models_pkl/best_suitability_model.pkl')
-thermal_model = joblib.load('models_pkl/best_thermal_model.pkl')
-cost_model = joblib.load('models_pkl/best_cost_model.pkl')
-
-# Load material database
-material_db = pd.read_csv('dataset/facade_material_dataset.csv')
+# Current published version from models_pkl/manifest.json (or the flat legacy
+# files), smoke-tested on dataset rows and hot-swapped when a retrain publishes
+# a new version. MODEL_WATCH_INTERVAL=0 disables the background watcher.
+# Under gunicorn --preload each forked worker restarts the watcher on its
+# first request (see ModelRegistry.start_watching).
+model_registry = ModelRegistry(
+    material_db, poll_interval=float(os.environ.get('MODEL_WATCH_INTERVAL', '30'))
+)
+model_registry.load_initial()
+model_registry.start_watching()
 
 NUMERIC_KEYS = [
     'floor_count', 'facade_area_sqm', 'max_cost_per_sqm',
@@ -30,13 +44,49 @@ NUMERIC_KEYS = [
     'avg_temp_c', 'avg_humidity_pct', 'avg_rainfall_mm'
 ]
 
-MATERIAL_FEATURES = [
-    'material_id', 'material_type', 'material_subtype', 'cost_per_sqm',
-    'installation_cost_per_sqm', 'material_u_value', 'material_shgc',
-    'material_vlt_percent', 'fire_rating', 'durability_years',
-    'maintenance_freq_per_year', 'acoustic_rating_rw', 'water_absorption_pct',
-    'material_density_kgm3', 'surface_reflectivity_pct', 'material_lifespan_years'
-]
+MAX_SWEEP_STEPS = 50
+MAX_REPORT_PROJECTS = 200
+
+
+def parse_input(args):
+    """
+    Convert project inputs (query args or a plain dict): numeric keys to float,
+    everything else lowercase.
+    """
+    input_data = dict(args.items())
+
+    # Convert numeric inputs
+    for key in NUMERIC_KEYS:
+        if input_data.get(key):
+            input_data[key] = float(input_data[key])
+
+    # Convert all string inputs to lowercase
+    for key, value in input_data.items():
+        if key not in NUMERIC_KEYS and isinstance(value, str):
+            input_data[key] = value.lower()
+
+    return input_data
+
+
+def parse_sweep_spec(spec):
+    """
+    Parse a sweep spec of the form 'param:start:stop:steps' into (param, values).
+    Only numeric project inputs can be swept.
+    """
+    parts = spec.split(':')
+    if len(parts) != 4:
+        raise ValueError(f"Invalid sweep spec '{spec}', expected param:start:stop:steps")
+
+    param = parts[0]
+    if param not in NUMERIC_KEYS:
+        raise ValueError(f"Cannot sweep '{param}', must be one of {NUMERIC_KEYS}")
+
+    start, stop = float(parts[1]), float(parts[2])
+    steps = int(parts[3])
+    if not 1 <= steps <= MAX_SWEEP_STEPS:
+        raise ValueError(f"Sweep steps must be between 1 and {MAX_SWEEP_STEPS}")
+
+    return param, np.linspace(start, stop, steps).tolist()
 
 # -----------------------------
 # INDEX ROUTE
@@ -66,52 +116,41 @@ def index():
 # -----------------------------
 # RECOMMENDATION ROUTE
 # -----------------------------
-@app.route('/recommendation')
-def recommendation():
-    input_data = request.args.to_dict()
-
-    # Convert numeric inputs
-    for key in NUMERIC_KEYS:
-        if input_data.get(key):
-            input_data[key] = float(input_data[key])
-
-    # Convert all string inputs to lowercase
-    for key, value in input_data.items():
-        if key not in NUMERIC_KEYS and isinstance(value, str):
-            input_data[key] = value.lower()
-
+def score_project(input_data):
+    """
+    Score the material catalog for one project.
+    Returns a dict with all predictions, the top-3 unique materials, the
+    budget warning flag and the Pareto fronts over cost / thermal (/ score).
+    """
     # -----------------------------
-    # Phase-2: Material Comparison
+    # Phase-2: Material Comparison (one batched predict per model)
     # -----------------------------
-    preds = []
-    for _, material_row in material_db.iterrows():
-        combined_row = input_data.copy()
-        for feature in MATERIAL_FEATURES:
-            combined_row[feature] = material_row[feature]
-
-        df_row = pd.DataFrame([combined_row])
-        X_proc = preprocess_input(df_row, preprocessor)
-
-        preds.append({
-            'material_id': material_row['material_id'],
-            'material_type': material_row['material_type'],
-            'score': float(suitability_model.predict(X_proc)[0]),
-            'thermal': float(thermal_model.predict(X_proc)[0]),
-            'cost': float(cost_model.predict(X_proc)[0])
-        })
+    models = model_registry.current()
+    preds = predict_materials(
+        input_data, material_db, models.preprocessor,
+        models.suitability_model, models.thermal_model, models.cost_model
+    )
 
     # -----------------------------
     # Top 3 unique materials by score
     # -----------------------------
-    preds_sorted = sorted(preds, key=lambda x: x['score'], reverse=True)
-    top_materials = []
-    seen_types = set()
-    for p in preds_sorted:
-        if p['material_type'].lower() not in seen_types:
-            top_materials.append(p)
-            seen_types.add(p['material_type'].lower())
-        if len(top_materials) == 3:
-            break
+    with timed("top_materials"):
+        preds_sorted = sorted(preds, key=lambda x: x['score'], reverse=True)
+        top_materials = []
+        seen_types = set()
+        for p in preds_sorted:
+            if p['material_type'].lower() not in seen_types:
+                top_materials.append(p)
+                seen_types.add(p['material_type'].lower())
+            if len(top_materials) == 3:
+                break
+
+    # -----------------------------
+    # Pareto fronts (non-dominated trade-offs)
+    # -----------------------------
+    with timed("pareto"):
+        front_2d, front_3d = material_pareto_fronts(preds)
+    pareto_materials = sorted((preds[i] for i in front_3d), key=lambda x: x['score'], reverse=True)
 
     # -----------------------------
     # Budget warning
@@ -133,6 +172,66 @@ def recommendation():
         mat['thermal_indicator'] = 'green' if mat['thermal'] <= THERMAL_GOOD else 'red'
         mat['cost_indicator'] = 'green' if mat['cost'] <= max_budget * COST_GOOD_RATIO else 'red'
 
+    return {
+        'preds': preds,
+        'top_materials': top_materials,
+        'pareto_front': [preds[i] for i in front_2d],
+        'pareto_materials': pareto_materials,
+        'budget_warning': budget_warning
+    }
+
+
+def missing_project_fields(input_data, preprocessor):
+    """Project inputs the preprocessor needs that are absent or empty in input_data."""
+    return [
+        col for col in preprocessor.feature_names_in_
+        if col not in MATERIAL_FEATURES and input_data.get(col) in (None, '')
+    ]
+
+
+def non_string_project_fields(input_data, preprocessor):
+    """Categorical project inputs the preprocessor needs that are not strings."""
+    return [
+        col for col in preprocessor.feature_names_in_
+        if col not in MATERIAL_FEATURES and col not in NUMERIC_KEYS
+        and col in input_data and not isinstance(input_data[col], str)
+    ]
+
+
+def top_glass_recommendations():
+    """Top unique glass options as template/PDF-ready records."""
+    glass_df = get_top_glass_materials(top_n=5)
+
+    with timed("glass_format"):
+        # Keep top unique glass options by material_name
+        glass_df = glass_df.sort_values('final_score', ascending=False)
+        glass_df = glass_df.drop_duplicates(subset='material_name', keep='first')
+
+        glass_df['score'] = glass_df['final_score']
+
+        numeric_cols = [
+            'score', 'material_u_value', 'material_shgc', 'material_vlt_percent',
+            'acoustic_rating_rw', 'cost_per_sqm', 'thickness_mm'
+        ]
+        for col in numeric_cols:
+            if col in glass_df.columns:
+                glass_df[col] = glass_df[col].fillna(0)
+
+        return glass_df.to_dict(orient='records')
+
+
+@app.route('/recommendation')
+@timed("recommendation_total")
+def recommendation():
+    with timed("parse_input"):
+        input_data = parse_input(request.args)
+
+    result = score_project(input_data)
+    preds = result['preds']
+    top_materials = result['top_materials']
+    pareto_materials = result['pareto_materials']
+    budget_warning = result['budget_warning']
+
     suitability_score = round(top_materials[0]['score'], 2)
     thermal_perf = round(top_materials[0]['thermal'], 2)
     cost_est = round(top_materials[0]['cost'], 2)
@@ -140,34 +239,19 @@ def recommendation():
     # -----------------------------
     # Phase-1: Glass Detailed Recommendation
     # -----------------------------
-    glass_df = get_top_glass_materials(top_n=5)
-
-    # Keep top unique glass options by material_name
-    glass_df = glass_df.sort_values('final_score', ascending=False)
-    glass_df = glass_df.drop_duplicates(subset='material_name', keep='first')
-
-    glass_df['score'] = glass_df['final_score']
-
-    numeric_cols = [
-        'score', 'material_u_value', 'material_shgc', 'material_vlt_percent',
-        'acoustic_rating_rw', 'cost_per_sqm', 'thickness_mm'
-    ]
-    for col in numeric_cols:
-        if col in glass_df.columns:
-            glass_df[col] = glass_df[col].fillna(0)
-
-    glass_recommendations = glass_df.to_dict(orient='records')
+    glass_recommendations = top_glass_recommendations()
 
     # -----------------------------
     # Charts
     # -----------------------------
     chart_bar_buf = bar_chart_top_materials(top_materials)
-    chart_scatter_buf = scatter_cost_vs_thermal(preds)
+    chart_scatter_buf = scatter_cost_vs_thermal(preds, pareto_front=result['pareto_front'])
     chart_multi_buf = multi_material_comparison_chart(top_materials)
 
-    chart_bar = base64.b64encode(chart_bar_buf.getvalue()).decode('utf-8')
-    chart_scatter = base64.b64encode(chart_scatter_buf.getvalue()).decode('utf-8')
-    chart_multi = base64.b64encode(chart_multi_buf.getvalue()).decode('utf-8')
+    with timed("base64_encode"):
+        chart_bar = base64.b64encode(chart_bar_buf.getvalue()).decode('utf-8')
+        chart_scatter = base64.b64encode(chart_scatter_buf.getvalue()).decode('utf-8')
+        chart_multi = base64.b64encode(chart_multi_buf.getvalue()).decode('utf-8')
 
     # -----------------------------
     # Export PDF
@@ -183,19 +267,90 @@ def recommendation():
         output_path=pdf_path
     )
 
-    return render_template(
-        'recommendation.html',
-        top_materials=top_materials,
-        suitability_score=suitability_score,
-        thermal_perf=thermal_perf,
-        cost_est=cost_est,
-        chart_bar=chart_bar,
-        chart_scatter=chart_scatter,
-        chart_multi=chart_multi,
-        pdf_file_path=pdf_path,
-        glass_recommendations=glass_recommendations,
-        budget_warning=budget_warning
-    )
+    with timed("render_template"):
+        return render_template(
+            'recommendation.html',
+            top_materials=top_materials,
+            suitability_score=suitability_score,
+            thermal_perf=thermal_perf,
+            cost_est=cost_est,
+            chart_bar=chart_bar,
+            chart_scatter=chart_scatter,
+            chart_multi=chart_multi,
+            pdf_file_path=pdf_path,
+            glass_recommendations=glass_recommendations,
+            pareto_materials=pareto_materials,
+            budget_warning=budget_warning
+        )
+
+
+# -----------------------------
+# JSON API
+# -----------------------------
+def _material_fields(m):
+    return {
+        'material_id': m['material_id'],
+        'material_type': m['material_type'],
+        'score': m['score'],
+        'thermal': m['thermal'],
+        'cost': m['cost']
+    }
+
+
+@app.route('/api/recommendation')
+def api_recommendation():
+    """JSON version of /recommendation: top materials and Pareto fronts, no charts or PDF."""
+    try:
+        input_data = parse_input(request.args)
+        result = score_project(input_data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'top_materials': [
+            dict(_material_fields(m), thermal_indicator=m['thermal_indicator'],
+                 cost_indicator=m['cost_indicator'])
+            for m in result['top_materials']
+        ],
+        'budget_warning': result['budget_warning'],
+        'pareto_front': {
+            'cost_thermal': [_material_fields(m) for m in result['pareto_front']],
+            'cost_thermal_score': [_material_fields(m) for m in result['pareto_materials']]
+        }
+    })
+
+
+# -----------------------------
+# WHAT-IF SENSITIVITY SWEEP
+# -----------------------------
+@app.route('/sweep')
+def sweep():
+    """
+    Same project inputs as /recommendation plus one or two
+    `sweep=param:start:stop:steps` args; returns the top material per grid point.
+    """
+    specs = request.args.getlist('sweep')
+    try:
+        sweeps = dict(parse_sweep_spec(spec) for spec in specs)
+        if len(sweeps) != len(specs):
+            raise ValueError("Each sweep parameter can only be given once")
+
+        base_input = parse_input(request.args)
+        base_input.pop('sweep', None)
+
+        models = model_registry.current()
+        results = sensitivity_sweep(
+            base_input, sweeps, material_db, models.preprocessor,
+            models.suitability_model, models.thermal_model, models.cost_model
+        )
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({
+        'parameters': list(sweeps),
+        'grid': {param: values for param, values in sweeps.items()},
+        'results': results
+    })
 
 
 # -----------------------------
@@ -209,6 +364,103 @@ def download_pdf():
     return send_file(pdf_path, as_attachment=True)
 
 
+# -----------------------------
+# PORTFOLIO REPORT JOBS
+# -----------------------------
+def _job_status(job):
+    status = {
+        'job_id': job['id'],
+        'status': job['status'],
+        'progress': job['progress'],
+        'total': job['total'],
+        'error': job['error']
+    }
+    if job['status'] == jobs.STATUS_DONE:
+        status['download_url'] = url_for('download_report', job_id=job['id'])
+    return status
+
+
+@app.route('/reports', methods=['POST'])
+def submit_report():
+    """
+    Queue a consolidated PDF for a portfolio of projects. Body:
+    {"title": optional, "projects": [{"name": ..., <same inputs as /recommendation>}, ...]}
+    Returns 202 with the job ID; a report worker (python -m reports.worker) builds it.
+    """
+    body = request.get_json(silent=True) or {}
+    projects = body.get('projects')
+    if not isinstance(projects, list) or not projects:
+        return jsonify({'error': "'projects' must be a non-empty list"}), 400
+    if len(projects) > MAX_REPORT_PROJECTS:
+        return jsonify({'error': f"At most {MAX_REPORT_PROJECTS} projects per report"}), 400
+
+    preprocessor = model_registry.current().preprocessor
+    for i, project in enumerate(projects):
+        if not isinstance(project, dict):
+            return jsonify({'error': f"Project {i} must be an object"}), 400
+        try:
+            input_data = parse_input(project)
+        except (TypeError, ValueError) as e:
+            return jsonify({'error': f"Project {i}: {e}"}), 400
+        missing = missing_project_fields(input_data, preprocessor)
+        if missing:
+            return jsonify({'error': f"Project {i}: missing required inputs {missing}"}), 400
+        non_string = non_string_project_fields(input_data, preprocessor)
+        if non_string:
+            return jsonify({'error': f"Project {i}: inputs {non_string} must be strings"}), 400
+
+    job_id = jobs.submit_job({'title': body.get('title'), 'projects': projects}, total=len(projects))
+    return jsonify({
+        'job_id': job_id,
+        'status': jobs.STATUS_QUEUED,
+        'status_url': url_for('report_status', job_id=job_id)
+    }), 202
+
+
+@app.route('/reports/<job_id>')
+def report_status(job_id):
+    job = jobs.get_job(job_id)
+    if job is None:
+        return jsonify({'error': "Job not found"}), 404
+    return jsonify(_job_status(job))
+
+
+@app.route('/reports/<job_id>/download')
+def download_report(job_id):
+    job = jobs.get_job(job_id)
+    if job is None:
+        return jsonify({'error': "Job not found"}), 404
+    if job['status'] != jobs.STATUS_DONE:
+        return jsonify(_job_status(job)), 409
+    if not os.path.exists(job['result_path']):
+        return "Report not found", 404
+    return send_file(job['result_path'], as_attachment=True,
+                     download_name=f"portfolio_report_{job_id}.pdf")
+
+
+# -----------------------------
+# METRICS / SERVER-TIMING
+# -----------------------------
+@app.before_request
+def _start_timing():
+    start_request()
+
+
+@app.after_request
+def _add_server_timing(response):
+    if app.config['SERVER_TIMING']:
+        spans = request_spans()
+        if spans:
+            response.headers['Server-Timing'] = server_timing_header(spans)
+    return response
+
+
+@app.route('/metrics')
+def metrics():
+    """Per-stage latency summaries (count, sum, p50/p95/p99) in Prometheus text format."""
+    return Response(render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+
 # -----------------------------
 # RUN APP
 # -----------------------------
@@ -0,0 +1,168 @@
+import itertools
+import numpy as np
+import pandas as pd
+
+from model_training.preprocessing import preprocess_input
+from monitoring.timing import timed
+
+MATERIAL_FEATURES = [
+    'material_id', 'material_type', 'material_subtype', 'cost_per_sqm',
+    'installation_cost_per_sqm', 'material_u_value', 'material_shgc',
+    'material_vlt_percent', 'fire_rating', 'durability_years',
+    'maintenance_freq_per_year', 'acoustic_rating_rw', 'water_absorption_pct',
+    'material_density_kgm3', 'surface_reflectivity_pct', 'material_lifespan_years'
+]
+
+# Upper bound on grid points for a single sweep (grid x materials rows are predicted at once)
+MAX_SWEEP_POINTS = 400
+
+
+# -----------------------------
+# BUILD FEATURE MATRIX
+# -----------------------------
+def unique_material_rows(material_db):
+    """
+    Distinct MATERIAL_FEATURES rows of the catalog, which repeats materials.
+
+    Returns (materials, inverse): the distinct rows in first-seen order and,
+    for every catalog row, the position of its distinct row, so predictions
+    made once per distinct row map back with values[..., inverse].
+    """
+    row_hashes = pd.util.hash_pandas_object(material_db[MATERIAL_FEATURES], index=False)
+    inverse, _ = pd.factorize(row_hashes)
+    _, first = np.unique(inverse, return_index=True)
+    return material_db.iloc[first].reset_index(drop=True), inverse
+
+
+def build_material_frame(input_rows, material_db):
+    """
+    Cross-join project inputs with every material in the catalog.
+
+    input_rows: list of dicts (one per project / grid point)
+    Returns a DataFrame of len(input_rows) * len(material_db) rows, ordered
+    project-major so predictions reshape to (n_projects, n_materials).
+    """
+    if not input_rows:
+        raise ValueError("input_rows is empty")
+
+    materials = material_db[MATERIAL_FEATURES].reset_index(drop=True)
+    n_materials = len(materials)
+
+    df = pd.concat([materials] * len(input_rows), ignore_index=True)
+    keys = sorted({key for row in input_rows for key in row if key not in MATERIAL_FEATURES})
+    for key in keys:
+        values = pd.Series([row.get(key) for row in input_rows])
+        df[key] = values.repeat(n_materials).to_numpy()
+    return df
+
+
+# -----------------------------
+# BATCHED PREDICTION
+# -----------------------------
+def predict_batch(df, preprocessor, suitability_model, thermal_model, cost_model,
+                  stage_prefix=""):
+    """
+    Preprocess once and run each model a single time over the whole frame.
+    Returns a dict of 1-D numpy arrays keyed by 'score', 'thermal' and 'cost'.
+
+    stage_prefix is prepended to the timing stage names, so large batches
+    (e.g. sweeps) don't share histograms with single-project requests.
+    """
+    with timed(f"{stage_prefix}preprocess"):
+        X_proc = preprocess_input(df, preprocessor)
+
+    out = {}
+    for key, name, model in [('score', 'suitability', suitability_model),
+                             ('thermal', 'thermal', thermal_model),
+                             ('cost', 'cost', cost_model)]:
+        with timed(f"{stage_prefix}predict_{name}"):
+            out[key] = np.asarray(model.predict(X_proc), dtype=float)
+    return out
+
+
+def predict_materials(input_data, material_db, preprocessor,
+                      suitability_model, thermal_model, cost_model):
+    """
+    Score every material in the catalog for a single project. Each distinct
+    material row is predicted once. Returns a list of prediction dicts in
+    catalog order.
+    """
+    with timed("build_features"):
+        materials, inverse = unique_material_rows(material_db)
+        df = build_material_frame([input_data], materials)
+    out = predict_batch(df, preprocessor, suitability_model, thermal_model, cost_model)
+    out = {key: values[inverse] for key, values in out.items()}
+
+    return [
+        {
+            'material_id': material_id,
+            'material_type': material_type,
+            'score': float(score),
+            'thermal': float(thermal),
+            'cost': float(cost)
+        }
+        for material_id, material_type, score, thermal, cost in zip(
+            material_db['material_id'], material_db['material_type'],
+            out['score'], out['thermal'], out['cost']
+        )
+    ]
+
+
+# -----------------------------
+# WHAT-IF SENSITIVITY SWEEP
+# -----------------------------
+def sensitivity_sweep(base_input, sweeps, material_db, preprocessor,
+                      suitability_model, thermal_model, cost_model):
+    """
+    Vary one or two numeric inputs over a grid and report how the best material
+    changes, using a single batched prediction over grid x distinct materials.
+
+    sweeps: dict {param_name: list of values}, at most two entries
+    Returns a list of dicts, one per grid point, with the swept values and the
+    top material's id, type, score, thermal and cost.
+    """
+    if not sweeps:
+        raise ValueError("At least one sweep parameter is required")
+    if len(sweeps) > 2:
+        raise ValueError("At most two sweep parameters are supported")
+
+    params = list(sweeps)
+    grid = list(itertools.product(*(sweeps[p] for p in params)))
+    if len(grid) > MAX_SWEEP_POINTS:
+        raise ValueError(f"Sweep grid has {len(grid)} points (max {MAX_SWEEP_POINTS})")
+
+    input_rows = []
+    for values in grid:
+        row = dict(base_input)
+        row.update(zip(params, values))
+        input_rows.append(row)
+
+    with timed("sweep_build_features"):
+        materials, inverse = unique_material_rows(material_db)
+        df = build_material_frame(input_rows, materials)
+    out = predict_batch(df, preprocessor, suitability_model, thermal_model, cost_model,
+                        stage_prefix="sweep_")
+
+    # Expand distinct-material predictions back to catalog order
+    n_materials = len(materials)
+    scores = out['score'].reshape(len(grid), n_materials)[:, inverse]
+    thermal = out['thermal'].reshape(len(grid), n_materials)[:, inverse]
+    cost = out['cost'].reshape(len(grid), n_materials)[:, inverse]
+    best = scores.argmax(axis=1)
+
+    material_ids = material_db['material_id'].to_numpy()
+    material_types = material_db['material_type'].to_numpy()
+
+    results = []
+    for i, values in enumerate(grid):
+        j = best[i]
+        point = {p: float(v) for p, v in zip(params, values)}
+        point.update({
+            'material_id': str(material_ids[j]),
+            'material_type': str(material_types[j]),
+            'score': float(scores[i, j]),
+            'thermal': float(thermal[i, j]),
+            'cost': float(cost[i, j])
+        })
+        results.append(point)
+    return results
@@ -0,0 +1,219 @@
+# dataset_cache.py
+# Typed columnar cache for the CSV datasets.
+#
+# Each CSV is parsed once and stored next to it as a single binary file of
+# column arrays: numeric columns keep their dtype, string columns are stored as
+# int32 codes plus a category list. Later loads memory-map that file once and
+# view each column in place instead of re-parsing the CSV.
+#
+#   dataset/.cache/<name>.json                     source size / mtime / sha256 → cache dir
+#   dataset/.cache/<name>-v<N>-<sha256[:16]>/      meta.json + columns.bin
+#
+# Cache directories are immutable and named by content hash, so concurrent
+# workers can build them without locking; the first rename wins.
+#
+# DATASET_CACHE_DIR moves the cache elsewhere (e.g. a writable volume). If the
+# cache cannot be written at all, datasets are read straight from the CSV.
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+CACHE_DIRNAME = ".cache"
+CACHE_FORMAT_VERSION = 2
+COLUMN_ALIGNMENT = 64        # Byte alignment of each column in columns.bin
+
+
+def _cache_root(path):
+    root = os.environ.get('DATASET_CACHE_DIR')
+    if root:
+        return os.path.abspath(root)
+    return os.path.join(os.path.dirname(os.path.abspath(path)), CACHE_DIRNAME)
+
+
+def _file_sha256(path):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _write_json_atomic(data, path):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".json.tmp")
+    with os.fdopen(fd, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+# -----------------------------
+# BUILD
+# -----------------------------
+def build_cache(path, cache_dir):
+    """Parse the CSV once and write its columns into cache_dir/columns.bin."""
+    df = pd.read_csv(path)
+
+    tmp_dir = tempfile.mkdtemp(dir=os.path.dirname(cache_dir), prefix=".build-")
+    try:
+        columns = []
+        offset = 0
+        with open(os.path.join(tmp_dir, "columns.bin"), 'wb') as f:
+            for col in df.columns:
+                series = df[col]
+                if pd.api.types.is_numeric_dtype(series) or pd.api.types.is_bool_dtype(series):
+                    values = np.ascontiguousarray(series.to_numpy())
+                    entry = {'name': col, 'kind': 'numeric'}
+                else:
+                    codes, categories = pd.factorize(series)
+                    values = codes.astype(np.int32)
+                    entry = {'name': col, 'kind': 'categorical',
+                             'categories': [str(c) for c in categories]}
+
+                padding = -offset % COLUMN_ALIGNMENT
+                f.write(b'\0' * padding)
+                offset += padding
+                entry.update({'dtype': values.dtype.str, 'offset': offset})
+                f.write(values.tobytes())
+                offset += values.nbytes
+                columns.append(entry)
+
+        meta = {'format_version': CACHE_FORMAT_VERSION, 'rows': len(df), 'columns': columns}
+        with open(os.path.join(tmp_dir, "meta.json"), 'w') as f:
+            json.dump(meta, f)
+
+        try:
+            os.rename(tmp_dir, cache_dir)
+        except OSError:
+            # Another process published the same content hash first
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+    except BaseException:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        raise
+
+
+# -----------------------------
+# LOAD
+# -----------------------------
+def _read_csv_uncached(path, lowercase=False):
+    """Plain read_csv with the same lowercasing as read_cache, for unwritable caches."""
+    df = pd.read_csv(path)
+    str_cols = [c for c in df.columns
+                if not (pd.api.types.is_numeric_dtype(df[c]) or pd.api.types.is_bool_dtype(df[c]))]
+    if lowercase is True:
+        lower_cols = str_cols
+    else:
+        lower_cols = [c for c in (lowercase or []) if c in str_cols]
+    for col in lower_cols:
+        df[col] = df[col].astype(str).str.lower().where(df[col].notna())
+    return df
+
+
+def read_cache(cache_dir, lowercase=False):
+    """
+    Rebuild a DataFrame from a cache directory. Numeric columns are views
+    into one copy-on-write memory map of columns.bin, so callers may modify
+    them without touching the cache.
+
+    lowercase: True to lowercase every string column, or a list of column
+    names. Only the unique categories are lowercased, not every row.
+    """
+    with open(os.path.join(cache_dir, "meta.json")) as f:
+        meta = json.load(f)
+
+    if lowercase is True:
+        lower_cols = {c['name'] for c in meta['columns']}
+    else:
+        lower_cols = set(lowercase or [])
+
+    rows = meta['rows']
+    buffer = None
+    if rows:
+        # Plain ndarray view of the mapping so columns don't surface as np.memmap
+        buffer = np.asarray(np.memmap(os.path.join(cache_dir, "columns.bin"), dtype=np.uint8, mode='c'))
+
+    data = {}
+    for col in meta['columns']:
+        dtype = np.dtype(col['dtype'])
+        if buffer is None:
+            values = np.empty(0, dtype=dtype)
+        else:
+            start = col['offset']
+            values = buffer[start:start + rows * dtype.itemsize].view(dtype)
+
+        if col['kind'] == 'numeric':
+            data[col['name']] = values
+            continue
+
+        categories = col['categories']
+        if col['name'] in lower_cols:
+            categories = [c.lower() for c in categories]
+        # Index len(categories) (code -1) maps to NaN for missing values
+        lookup = np.array(categories + [np.nan], dtype=object)
+        data[col['name']] = lookup[values]
+
+    # copy=False keeps numeric columns backed by the memory map
+    return pd.DataFrame(data, copy=False)
+
+
+def _prepare_cache(path):
+    """Return the up-to-date cache directory for path, building it if needed."""
+    cache_root = _cache_root(path)
+    os.makedirs(cache_root, exist_ok=True)
+    name = os.path.splitext(os.path.basename(path))[0]
+    index_path = os.path.join(cache_root, f"{name}.json")
+
+    stat = os.stat(path)
+    index = None
+    if os.path.exists(index_path):
+        with open(index_path) as f:
+            index = json.load(f)
+
+    if (index and index.get('format_version') == CACHE_FORMAT_VERSION
+            and index['size'] == stat.st_size and index['mtime_ns'] == stat.st_mtime_ns):
+        sha256 = index['sha256']
+    else:
+        sha256 = _file_sha256(path)
+
+    cache_dir = os.path.join(cache_root, f"{name}-v{CACHE_FORMAT_VERSION}-{sha256[:16]}")
+    if not os.path.exists(os.path.join(cache_dir, "meta.json")):
+        build_cache(path, cache_dir)
+
+    if not index or index['sha256'] != sha256 or index['mtime_ns'] != stat.st_mtime_ns:
+        try:
+            _write_json_atomic({
+                'format_version': CACHE_FORMAT_VERSION,
+                'source': os.path.basename(path),
+                'size': stat.st_size,
+                'mtime_ns': stat.st_mtime_ns,
+                'sha256': sha256
+            }, index_path)
+        except OSError:
+            # A prebuilt cache on a read-only volume is still usable; only the
+            # size/mtime shortcut is lost, so the source is re-hashed next time
+            pass
+
+    return cache_dir
+
+
+def load_csv_cached(path, lowercase=False):
+    """
+    Load a CSV through the columnar cache, building or refreshing it if the
+    source changed. A size/mtime match skips hashing; otherwise the source is
+    hashed and only re-parsed if its content actually changed. Falls back to
+    reading the CSV directly if the cache directory cannot be written.
+    """
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"Dataset not found at {path}")
+
+    try:
+        cache_dir = _prepare_cache(path)
+    except OSError as e:
+        print(f"[WARN] Dataset cache not writable ({e}); reading {path} directly")
+        return _read_csv_uncached(path, lowercase=lowercase)
+
+    return read_cache(cache_dir, lowercase=lowercase)
+
@@ -1,20 +1,30 @@
 # glass_recommendation.py
 import pandas as pd
 import os
+from model_training.dataset_cache import load_csv_cached
+from monitoring.timing import timed
 
 GLASS_DATASET_PATH = "dataset/glass_dataset.csv"
 
-def get_top_glass_materials(input_data=None, top_n=5):
-    """
-    Return top N glass materials for the customer, considering duplicates
-    and input constraints.
+# Validated, typed glass dataset kept in memory between calls, keyed by path
+# and refreshed when the file changes
+_glass_cache = {}
 
-    input_data: dict containing customer's requirements
-    """
+
+def _load_glass_dataset():
     if not os.path.exists(GLASS_DATASET_PATH):
         raise FileNotFoundError(f"Glass dataset not found at {GLASS_DATASET_PATH}")
 
-    df = pd.read_csv(GLASS_DATASET_PATH)
+    stat = os.stat(GLASS_DATASET_PATH)
+    key = (stat.st_size, stat.st_mtime_ns)
+    cached = _glass_cache.get(GLASS_DATASET_PATH)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+
+    # Convert categorical/string columns to lowercase (done once per category by the cache)
+    str_cols = ["glass_type", "fire_rating", "solar_control_coating", "environmental_suitability"]
+    with timed("glass_load"):
+        df = load_csv_cached(GLASS_DATASET_PATH, lowercase=str_cols)
 
     required_cols = [
         "glass_type", "u_value", "shgc", "vlt",
@@ -33,10 +43,20 @@ def get_top_glass_materials(input_data=None, top_n=5):
     for col in numeric_cols:
         df[col] = pd.to_numeric(df[col], errors='coerce').fillna(0)
 
-    # Convert categorical/string columns to lowercase
-    str_cols = ["glass_type", "fire_rating", "solar_control_coating", "environmental_suitability"]
-    for col in str_cols:
-        df[col] = df[col].astype(str).str.lower()
+    _glass_cache[GLASS_DATASET_PATH] = (key, df)
+    return df
+
+
+@timed("glass_ranking")
+def get_top_glass_materials(input_data=None, top_n=5):
+    """
+    Return top N glass materials for the customer, considering duplicates
+    and input constraints.
+
+    input_data: dict containing customer's requirements
+    """
+    # Shallow copy: score columns are added per call, the shared data is not modified
+    df = _load_glass_dataset().copy(deep=False)
 
     # Weighted score
     df["thermal_score"] = 100 - (df["u_value"] * 20)
@@ -0,0 +1,109 @@
+import numpy as np
+
+
+# -----------------------------
+# 2 OBJECTIVES: SORT + SCAN
+# -----------------------------
+def pareto_front_2d(a, b):
+    """
+    Indices of points non-dominated when minimizing both a and b.
+    O(n log n): sort by (a, b) then keep points that improve the running minimum of b.
+    Exact duplicates of a front point are kept on the front.
+    """
+    a = np.asarray(a, dtype=float)
+    b = np.asarray(b, dtype=float)
+    if a.shape != b.shape:
+        raise ValueError("Objective arrays must have the same length")
+    if a.size == 0:
+        return np.array([], dtype=int)
+
+    order = np.lexsort((b, a))
+    front = []
+    best_b = np.inf
+    last = None
+    for i in order:
+        if b[i] < best_b:
+            front.append(i)
+            best_b = b[i]
+            last = i
+        elif last is not None and a[i] == a[last] and b[i] == b[last]:
+            front.append(i)
+
+    return np.sort(np.array(front, dtype=int))
+
+
+# -----------------------------
+# 3+ OBJECTIVES: SORT-FILTER-SKYLINE
+# -----------------------------
+def skyline(objectives):
+    """
+    Indices of non-dominated rows of an (n, k) array, minimizing every column.
+
+    Rows are sorted by the sum of their min-max normalized objectives, a
+    monotone score, so the first remaining row can never be dominated. It
+    joins the skyline and every remaining row it dominates is filtered out
+    in one vectorized pass, giving O(n * h) work for a skyline of size h.
+    """
+    points = np.asarray(objectives, dtype=float)
+    if points.ndim != 2:
+        raise ValueError("objectives must be a 2-D array of shape (n, k)")
+    if points.shape[0] == 0:
+        return np.array([], dtype=int)
+
+    span = points.max(axis=0) - points.min(axis=0)
+    span[span == 0] = 1.0
+    norm = (points - points.min(axis=0)) / span
+    order = np.lexsort(points.T[::-1])
+    remaining = order[np.argsort(norm[order].sum(axis=1), kind="stable")]
+
+    front = []
+    while remaining.size:
+        i = remaining[0]
+        front.append(i)
+        rest = points[remaining[1:]]
+        dominated = np.all(points[i] <= rest, axis=1) & np.any(points[i] < rest, axis=1)
+        remaining = remaining[1:][~dominated]
+
+    return np.sort(np.array(front, dtype=int))
+
+
+def pareto_front(*objectives):
+    """
+    Indices of non-dominated points, minimizing every objective array passed in.
+    Negate an objective to maximize it.
+    """
+    if len(objectives) < 2:
+        raise ValueError("At least two objectives are required")
+    if len(objectives) == 2:
+        return pareto_front_2d(*objectives)
+    return skyline(np.column_stack(objectives))
+
+
+def material_pareto_fronts(preds):
+    """
+    Pareto fronts over a list of material predictions.
+
+    The catalog repeats rows with identical features, which get identical
+    predictions. Only the first of each identical (material_id, material_type,
+    cost, thermal, score) prediction is considered, so a repeated row appears on
+    a front at most once while distinct variants sharing a material_id (e.g.
+    M38 as both composite and terracotta) are still compared.
+
+    Returns (cost_thermal, cost_thermal_score): index arrays into preds for the
+    front minimizing cost and thermal gap, and for the front that also
+    maximizes suitability score.
+    """
+    seen = set()
+    unique = []
+    for i, p in enumerate(preds):
+        key = (p['material_id'], p['material_type'], p['cost'], p['thermal'], p['score'])
+        if key not in seen:
+            seen.add(key)
+            unique.append(i)
+    unique = np.array(unique, dtype=int)
+
+    cost = np.fromiter((preds[i]['cost'] for i in unique), dtype=float, count=len(unique))
+    thermal = np.fromiter((preds[i]['thermal'] for i in unique), dtype=float, count=len(unique))
+    score = np.fromiter((preds[i]['score'] for i in unique), dtype=float, count=len(unique))
+
+    return unique[pareto_front(cost, thermal)], unique[pareto_front(cost, thermal, -score)]
@@ -1,8 +1,8 @@
 import os
-import pandas as pd
 import joblib
 from sklearn.preprocessing import OneHotEncoder, StandardScaler
 from sklearn.compose import ColumnTransformer
+from model_training.dataset_cache import load_csv_cached
 
 # Ensure models directory exists
 os.makedirs("models_pkl", exist_ok=True)
@@ -11,11 +11,14 @@ os.makedirs("models_pkl", exist_ok=True)
 # -----------------------------
 # LOAD DATASET
 # -----------------------------
-def load_dataset(path):
-    """Load dataset CSV."""
+def load_dataset(path, lowercase=False):
+    """
+    Load dataset CSV through the columnar cache (parsed once, then memory-mapped).
+    lowercase: True to lowercase all string columns, or a list of column names.
+    """
     if not os.path.exists(path):
         raise FileNotFoundError(f"Dataset not found at {path}")
-    df = pd.read_csv(path)
+    df = load_csv_cached(path, lowercase=lowercase)
     print(f"[INFO] Dataset loaded from {path} with shape: {df.shape}")
     return df
 
@@ -23,10 +26,11 @@ def load_dataset(path):
 # -----------------------------
 # FIT PREPROCESSOR
 # -----------------------------
-def fit_preprocessor(df, phase="phase2"):
+def fit_preprocessor(df, phase="phase2", save_dir="models_pkl"):
     """
     Fit and save a ColumnTransformer for preprocessing.
     phase: "phase1" = glass dataset, "phase2" = facade materials
+    save_dir: directory the fitted preprocessor(s) are written to
     """
 
     if phase == "phase1":
@@ -85,13 +89,13 @@ def fit_preprocessor(df, phase="phase2"):
     preprocessor.fit(df[categorical_features + numeric_features])
 
     # Save preprocessor
-    save_path = f"models_pkl/{save_name}"
+    save_path = os.path.join(save_dir, save_name)
     joblib.dump(preprocessor, save_path)
     print(f"[INFO] Preprocessor saved at {save_path}")
 
     # For main.py compatibility, save a copy as 'preprocessor.pkl' for phase2
     if phase == "phase2":
-        joblib.dump(preprocessor, "models_pkl/preprocessor.pkl")
+        joblib.dump(preprocessor, os.path.join(save_dir, "preprocessor.pkl"))
         print(f"[INFO] Also saved preprocessor.pkl for main.py")
 
     return preprocessor
@@ -0,0 +1,273 @@
+# registry.py
+# Versioned model registry under models_pkl/:
+#
+#   models_pkl/manifest.json              {"current": "<version>", "versions": [...]}
+#   models_pkl/versions/<version>/*.pkl   preprocessor + best_{suitability,thermal,cost}_model
+#
+# Training writes a new version directory and then atomically replaces the
+# manifest. Serving workers poll the manifest, load and smoke-test the new set in
+# a background thread, and swap it in with a single reference assignment. If the
+# new set fails to load or predict, the last good set keeps serving.
+import json
+import os
+import tempfile
+import threading
+from datetime import datetime, timezone
+
+import joblib
+import numpy as np
+
+from model_training.preprocessing import preprocess_input
+
+MODELS_DIR = "models_pkl"
+VERSIONS_DIR = os.path.join(MODELS_DIR, "versions")
+MANIFEST_PATH = os.path.join(MODELS_DIR, "manifest.json")
+
+MODEL_FILES = {
+    'preprocessor': 'preprocessor.pkl',
+    'suitability_model': 'best_suitability_model.pkl',
+    'thermal_model': 'best_thermal_model.pkl',
+    'cost_model': 'best_cost_model.pkl'
+}
+
+LEGACY_VERSION = "legacy"       # Flat files directly under models_pkl/ (pre-registry layout)
+SMOKE_ROWS = 5
+
+
+class ModelSet:
+    """A preprocessor and the three target models loaded from one version."""
+
+    def __init__(self, version, preprocessor, suitability_model, thermal_model, cost_model):
+        self.version = version
+        self.preprocessor = preprocessor
+        self.suitability_model = suitability_model
+        self.thermal_model = thermal_model
+        self.cost_model = cost_model
+
+
+# -----------------------------
+# MANIFEST
+# -----------------------------
+def read_manifest(path=MANIFEST_PATH):
+    """Return the manifest dict, or None if no version has been published."""
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        return json.load(f)
+
+
+def write_manifest(manifest, path=MANIFEST_PATH):
+    """Write the manifest atomically (temp file in the same directory + os.replace)."""
+    directory = os.path.dirname(path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".manifest-", suffix=".json")
+    try:
+        with os.fdopen(fd, 'w') as f:
+            json.dump(manifest, f, indent=2)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def new_version_dir(versions_dir=VERSIONS_DIR):
+    """Create and return (version, path) for a fresh, timestamped version directory."""
+    version = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%fZ")
+    path = os.path.join(versions_dir, version)
+    os.makedirs(path)
+    return version, path
+
+
+def publish_version(version, manifest_path=MANIFEST_PATH, versions_dir=VERSIONS_DIR):
+    """Make `version` the current one. All model files must already be in its directory."""
+    version_path = os.path.join(versions_dir, version)
+    for filename in MODEL_FILES.values():
+        if not os.path.exists(os.path.join(version_path, filename)):
+            raise FileNotFoundError(f"Missing {filename} in {version_path}")
+
+    manifest = read_manifest(manifest_path) or {'versions': []}
+    manifest['versions'].append({
+        'version': version,
+        'created_at': datetime.now(timezone.utc).isoformat()
+    })
+    manifest['current'] = version
+    write_manifest(manifest, manifest_path)
+    print(f"[INFO] Published model version {version}")
+
+
+# -----------------------------
+# LOADING
+# -----------------------------
+def version_path(version, models_dir=MODELS_DIR):
+    if version == LEGACY_VERSION:
+        return models_dir
+    return os.path.join(models_dir, "versions", version)
+
+
+def load_model_set(version, models_dir=MODELS_DIR):
+    """Load every model file of a version into a ModelSet."""
+    path = version_path(version, models_dir)
+    loaded = {
+        name: joblib.load(os.path.join(path, filename))
+        for name, filename in MODEL_FILES.items()
+    }
+    return ModelSet(version, **loaded)
+
+
+def smoke_test(model_set, sample_df):
+    """
+    Run one small batched prediction per model (which also warms them up).
+    Raises ValueError if any model returns the wrong shape or non-finite values.
+    """
+    X_proc = preprocess_input(sample_df.copy(), model_set.preprocessor)
+    for name in ('suitability_model', 'thermal_model', 'cost_model'):
+        preds = np.asarray(getattr(model_set, name).predict(X_proc), dtype=float)
+        if preds.shape != (len(sample_df),) or not np.all(np.isfinite(preds)):
+            raise ValueError(f"Smoke prediction failed for {name} in version {model_set.version}")
+
+
+# -----------------------------
+# SERVING REGISTRY
+# -----------------------------
+class ModelRegistry:
+    """
+    Holds the model set currently used for serving and hot-swaps newer
+    published versions in the background.
+
+    sample_df: a few full feature rows (e.g. the head of the training dataset)
+    used to smoke-test and warm up each version before it is swapped in.
+    """
+
+    def __init__(self, sample_df, models_dir=MODELS_DIR, poll_interval=30):
+        self.sample_df = sample_df.head(SMOKE_ROWS).reset_index(drop=True)
+        self.models_dir = models_dir
+        self.manifest_path = os.path.join(models_dir, "manifest.json")
+        self.poll_interval = poll_interval
+        self.failed_versions = set()
+        self._manifest_mtime = None
+        self._current = None
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self._watching = False
+        self._watcher_pid = None
+        if hasattr(os, 'register_at_fork'):
+            os.register_at_fork(after_in_child=self._reset_after_fork)
+
+    def current(self):
+        """The active ModelSet. Grab it once per request so a swap never mixes versions."""
+        if self._current is None:
+            self.load_initial()
+        if self._watching and self._watcher_pid != os.getpid():
+            self._restart_watcher_after_fork()
+        return self._current
+
+    def _try_load(self, version):
+        try:
+            model_set = load_model_set(version, self.models_dir)
+            smoke_test(model_set, self.sample_df)
+            return model_set
+        except Exception as e:
+            self.failed_versions.add(version)
+            print(f"[WARN] Model version {version} rejected: {e}")
+            return None
+
+    def load_initial(self):
+        """
+        Load the manifest's current version, falling back to older published
+        versions and finally to the legacy flat files under models_pkl/.
+        """
+        with self._lock:
+            if self._current is not None:
+                return self._current
+
+            manifest = read_manifest(self.manifest_path)
+            candidates = []
+            if manifest:
+                self._manifest_mtime = os.stat(self.manifest_path).st_mtime_ns
+                candidates.append(manifest['current'])
+                candidates += [v['version'] for v in reversed(manifest['versions'])
+                               if v['version'] != manifest['current']]
+            candidates.append(LEGACY_VERSION)
+
+            for version in candidates:
+                model_set = self._try_load(version)
+                if model_set is not None:
+                    self._current = model_set
+                    print(f"[INFO] Serving model version {version}")
+                    return model_set
+
+            raise RuntimeError("No loadable model version found")
+
+    def check_for_update(self):
+        """
+        Reload if the manifest points at a new version. Returns True if a new
+        set was swapped in; a version that fails to load or smoke-test is
+        remembered and skipped, and the current set keeps serving.
+        """
+        if not os.path.exists(self.manifest_path):
+            return False
+        mtime = os.stat(self.manifest_path).st_mtime_ns
+        if mtime == self._manifest_mtime:
+            return False
+
+        manifest = read_manifest(self.manifest_path)
+        self._manifest_mtime = mtime
+        version = manifest['current']
+        if self._current is not None and version == self._current.version:
+            return False
+        if version in self.failed_versions:
+            return False
+
+        model_set = self._try_load(version)
+        if model_set is None:
+            print(f"[WARN] Keeping model version {self._current.version if self._current else None}")
+            return False
+
+        with self._lock:
+            self._current = model_set
+        print(f"[INFO] Hot-swapped to model version {version}")
+        return True
+
+    def _watch(self):
+        while not self._stop_event.wait(self.poll_interval):
+            try:
+                self.check_for_update()
+            except Exception as e:
+                print(f"[WARN] Model registry check failed: {e}")
+
+    def start_watching(self):
+        """
+        Poll the manifest every poll_interval seconds in a daemon thread.
+
+        Threads don't survive fork, so a process forked after this call (e.g.
+        a gunicorn worker with --preload) starts its own watcher on its first
+        current() call.
+        """
+        if self._thread is None and self.poll_interval > 0:
+            self._watching = True
+            self._watcher_pid = os.getpid()
+            self._thread = threading.Thread(target=self._watch, name="model-registry", daemon=True)
+            self._thread.start()
+
+    def _reset_after_fork(self):
+        # The lock may have been held by the parent's watcher at fork time, and
+        # the inherited thread object belongs to the parent
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def _restart_watcher_after_fork(self):
+        with self._lock:
+            if self._watcher_pid == os.getpid():
+                return
+            self.start_watching()
+            print(f"[INFO] Model registry watcher started in process {os.getpid()}")
+
+    def stop_watching(self):
+        self._watching = False
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -8,6 +8,7 @@ from catboost import CatBoostRegressor
 import optuna
 from numpy import sqrt
 from model_training.preprocessing import load_dataset, fit_preprocessor, preprocess_input
+from model_training.registry import new_version_dir, publish_version
 
 # Ensure models directory exists
 os.makedirs("models_pkl", exist_ok=True)
@@ -95,12 +96,16 @@ def get_best_model(X_train, X_test, y_train, y_test):
 # MAIN TRAINING FUNCTION
 # -----------------------------
 def train_all_targets():
-    df = load_dataset("dataset/facade_material_dataset.csv")
+    """
+    Train all three targets into a new version directory under
+    models_pkl/versions/ and publish it once every model is saved, so serving
+    workers only ever see complete model sets.
+    """
+    version, version_dir = new_version_dir()
+    print(f"[INFO] Training model version {version} → {version_dir}")
 
-    # Convert all categorical columns to lowercase
-    cat_cols = df.select_dtypes(include="object").columns
-    for col in cat_cols:
-        df[col] = df[col].astype(str).str.lower()
+    # Categorical columns come back lowercased from the dataset cache
+    df = load_dataset("dataset/facade_material_dataset.csv", lowercase=True)
 
     feature_cols = [col for col in df.columns if col not in ["suitability_score",
                                                              "thermal_gap_u_value",
@@ -111,7 +116,7 @@ def train_all_targets():
         "cost": "total_cost_estimate"
     }
 
-    preprocessor = fit_preprocessor(df)
+    preprocessor = fit_preprocessor(df, save_dir=version_dir)
 
     for name, target in targets.items():
         print(f"\n==============================")
@@ -126,9 +131,11 @@ def train_all_targets():
         X_test_p = preprocess_input(X_test, preprocessor)
 
         best_model = get_best_model(X_train_p, X_test_p, y_train, y_test)
-        joblib.dump(best_model, f"models_pkl/best_{name}_model.pkl")
-        print(f"[INFO] Saved → models_pkl/best_{name}_model.pkl")
+        save_path = os.path.join(version_dir, f"best_{name}_model.pkl")
+        joblib.dump(best_model, save_path)
+        print(f"[INFO] Saved → {save_path}")
 
+    publish_version(version)
     print("\n[INFO] 🎉 All models trained successfully!")
 
 if __name__ == "__main__":
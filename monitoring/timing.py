@@ -0,0 +1,115 @@
+# timing.py
+# Per-stage latency spans, aggregated per process into rolling histograms.
+# Each gunicorn worker keeps its own numbers; /metrics reports the worker that answers.
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+import numpy as np
+
+WINDOW_SIZE = 2048              # Most recent samples kept per stage for quantiles
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_NAME = "facade_stage_duration_seconds"
+
+_request_spans = ContextVar("request_spans", default=None)
+
+
+class StageHistogram:
+    """Running count/sum plus a ring buffer of recent durations for quantiles."""
+
+    def __init__(self, window_size=WINDOW_SIZE):
+        self.count = 0
+        self.total = 0.0
+        self._window = np.zeros(window_size)
+        self._lock = threading.Lock()
+
+    def observe(self, seconds):
+        with self._lock:
+            self._window[self.count % len(self._window)] = seconds
+            self.count += 1
+            self.total += seconds
+
+    def snapshot(self):
+        """Return (count, sum, {quantile: seconds}) for the current window."""
+        with self._lock:
+            count, total = self.count, self.total
+            samples = self._window[:min(count, len(self._window))].copy()
+        if samples.size == 0:
+            return count, total, {q: 0.0 for q in QUANTILES}
+        values = np.quantile(samples, QUANTILES)
+        return count, total, dict(zip(QUANTILES, values.tolist()))
+
+
+_histograms = {}
+_histograms_lock = threading.Lock()
+
+
+def observe(stage, seconds):
+    """Record one duration for a stage, and add it to the current request's spans."""
+    hist = _histograms.get(stage)
+    if hist is None:
+        with _histograms_lock:
+            hist = _histograms.setdefault(stage, StageHistogram())
+    hist.observe(seconds)
+
+    spans = _request_spans.get()
+    if spans is not None:
+        spans.append((stage, seconds))
+
+
+@contextmanager
+def timed(stage):
+    """
+    Time a block (or, as a decorator, a function call) under the given stage name.
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        observe(stage, time.perf_counter() - start)
+
+
+# -----------------------------
+# PER-REQUEST SPANS
+# -----------------------------
+def start_request():
+    """Begin collecting spans for the current request / context."""
+    _request_spans.set([])
+
+
+def request_spans():
+    """Spans recorded since start_request() as a list of (stage, seconds)."""
+    return list(_request_spans.get() or [])
+
+
+def server_timing_header(spans):
+    """Format spans as a Server-Timing header value (durations in ms)."""
+    return ", ".join(f"{stage};dur={seconds * 1000:.2f}" for stage, seconds in spans)
+
+
+# -----------------------------
+# EXPORT
+# -----------------------------
+def render_prometheus():
+    """Render every stage histogram in the Prometheus text exposition format."""
+    lines = [
+        f"# HELP {METRIC_NAME} Time spent in each recommendation pipeline stage.",
+        f"# TYPE {METRIC_NAME} summary",
+    ]
+    with _histograms_lock:
+        stages = sorted(_histograms.items())
+
+    for stage, hist in stages:
+        count, total, quantiles = hist.snapshot()
+        for q, value in quantiles.items():
+            lines.append(f'{METRIC_NAME}{{stage="{stage}",quantile="{q}"}} {value:.6f}')
+        lines.append(f'{METRIC_NAME}_sum{{stage="{stage}"}} {total:.6f}')
+        lines.append(f'{METRIC_NAME}_count{{stage="{stage}"}} {count}')
+
+    return "\n".join(lines) + "\n"
+
+
+def reset():
+    """Drop all recorded histograms."""
+    with _histograms_lock:
+        _histograms.clear()
@@ -0,0 +1,164 @@
+# jobs.py
+# SQLite-backed queue for background report jobs.
+#
+# Web workers only insert and read rows; report workers (reports/worker.py)
+# claim queued jobs inside a BEGIN IMMEDIATE transaction, so several worker
+# processes can share one queue without handing the same job out twice.
+import json
+import os
+import sqlite3
+import time
+import uuid
+
+JOBS_DIR = "report_jobs"
+DB_PATH = os.path.join(JOBS_DIR, "jobs.db")
+
+STATUS_QUEUED = "queued"
+STATUS_RUNNING = "running"
+STATUS_DONE = "done"
+STATUS_FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    progress INTEGER NOT NULL DEFAULT 0,
+    total INTEGER NOT NULL DEFAULT 0,
+    result_path TEXT,
+    error TEXT,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    started_at REAL,
+    heartbeat_at REAL,
+    finished_at REAL
+);
+CREATE INDEX IF NOT EXISTS jobs_status_created ON jobs (status, created_at);
+"""
+
+
+def connect(db_path=DB_PATH):
+    """Open the queue database (autocommit mode, WAL), creating it if needed."""
+    os.makedirs(os.path.dirname(db_path) or ".", exist_ok=True)
+    conn = sqlite3.connect(db_path, timeout=30, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+
+    # Queues created before heartbeats were tracked
+    columns = {row['name'] for row in conn.execute("PRAGMA table_info(jobs)")}
+    if 'attempts' not in columns:
+        conn.execute("ALTER TABLE jobs ADD COLUMN attempts INTEGER NOT NULL DEFAULT 0")
+    if 'heartbeat_at' not in columns:
+        conn.execute("ALTER TABLE jobs ADD COLUMN heartbeat_at REAL")
+    return conn
+
+
+def _job_dict(row):
+    if row is None:
+        return None
+    job = dict(row)
+    job['payload'] = json.loads(job['payload'])
+    return job
+
+
+def submit_job(payload, total, db_path=DB_PATH):
+    """Queue a job and return its ID. payload must be JSON serializable."""
+    job_id = uuid.uuid4().hex
+    conn = connect(db_path)
+    try:
+        conn.execute(
+            "INSERT INTO jobs (id, status, payload, total, created_at) VALUES (?, ?, ?, ?, ?)",
+            (job_id, STATUS_QUEUED, json.dumps(payload), total, time.time())
+        )
+    finally:
+        conn.close()
+    return job_id
+
+
+def get_job(job_id, db_path=DB_PATH):
+    """Return the job as a dict, or None if it does not exist."""
+    conn = connect(db_path)
+    try:
+        return _job_dict(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+    finally:
+        conn.close()
+
+
+def claim_next_job(conn):
+    """
+    Atomically mark the oldest queued job as running, count the attempt and
+    return it (or None).
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        row = conn.execute(
+            "SELECT * FROM jobs WHERE status = ? ORDER BY created_at LIMIT 1", (STATUS_QUEUED,)
+        ).fetchone()
+        if row is not None:
+            now = time.time()
+            conn.execute(
+                "UPDATE jobs SET status = ?, started_at = ?, heartbeat_at = ?, "
+                "attempts = attempts + 1 WHERE id = ?",
+                (STATUS_RUNNING, now, now, row['id'])
+            )
+            row = conn.execute("SELECT * FROM jobs WHERE id = ?", (row['id'],)).fetchone()
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return _job_dict(row)
+
+
+def heartbeat(conn, job_id):
+    """Record that the worker running job_id is still alive."""
+    conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time(), job_id))
+
+
+def update_progress(conn, job_id, progress):
+    conn.execute(
+        "UPDATE jobs SET progress = ?, heartbeat_at = ? WHERE id = ?",
+        (progress, time.time(), job_id)
+    )
+
+
+def complete_job(conn, job_id, result_path):
+    conn.execute(
+        "UPDATE jobs SET status = ?, result_path = ?, progress = total, finished_at = ? WHERE id = ?",
+        (STATUS_DONE, result_path, time.time(), job_id)
+    )
+
+
+def fail_job(conn, job_id, error):
+    conn.execute(
+        "UPDATE jobs SET status = ?, error = ?, finished_at = ? WHERE id = ?",
+        (STATUS_FAILED, error, time.time(), job_id)
+    )
+
+
+def requeue_stale_jobs(conn, timeout, max_attempts):
+    """
+    Recover running jobs whose worker has not sent a heartbeat for `timeout`
+    seconds (e.g. it crashed). They go back in the queue, unless they already
+    used max_attempts, in which case they are marked failed.
+    Returns (requeued, failed) counts.
+    """
+    cutoff = time.time() - timeout
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        failed = conn.execute(
+            "UPDATE jobs SET status = ?, error = ?, finished_at = ? "
+            "WHERE status = ? AND heartbeat_at < ? AND attempts >= ?",
+            (STATUS_FAILED, f"Worker stopped responding after {max_attempts} attempt(s)",
+             time.time(), STATUS_RUNNING, cutoff, max_attempts)
+        ).rowcount
+        requeued = conn.execute(
+            "UPDATE jobs SET status = ?, started_at = NULL, heartbeat_at = NULL, progress = 0 "
+            "WHERE status = ? AND heartbeat_at < ?",
+            (STATUS_QUEUED, STATUS_RUNNING, cutoff)
+        ).rowcount
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    return requeued, failed
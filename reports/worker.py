@@ -0,0 +1,141 @@
+# worker.py
+# Background worker pool for portfolio PDF reports.
+#
+#   python -m reports.worker --workers 2
+#
+# Each worker process loads the models once (by importing main), then loops:
+# claim a queued job, score every project, and build the combined PDF into
+# report_jobs/<job_id>.pdf. fpdf keeps the whole document, charts included, in
+# memory until it is written, so a worker's memory grows with the number of
+# projects in the job (at most MAX_REPORT_PROJECTS=200). Web workers only
+# enqueue and poll.
+import argparse
+import multiprocessing
+import os
+import time
+import traceback
+import warnings
+
+from reports import jobs
+
+POLL_INTERVAL = 2            # Seconds between queue checks when idle
+HEARTBEAT_TIMEOUT = 300      # Running jobs without a heartbeat for this long are assumed orphaned
+MAX_ATTEMPTS = 3             # Orphaned jobs are retried until they have been claimed this often
+
+
+def build_portfolio_report(job, conn, output_path):
+    """Score each project in the job and write one consolidated PDF to output_path."""
+    import main
+    from visualization.multi_material_chart import multi_material_comparison_chart
+    from visualization.pdf_export import PortfolioReport
+
+    payload = job['payload']
+    projects = payload['projects']
+
+    # Scoring is cheap (one batched predict per project); do it first so the
+    # summary table can lead the report
+    scored = []
+    for i, project in enumerate(projects):
+        name = project.get('name') or f"Project {i + 1}"
+        input_data = main.parse_input({k: v for k, v in project.items() if k != 'name'})
+        top_materials = main.score_project(input_data)['top_materials']
+        scored.append((name, top_materials))
+        jobs.heartbeat(conn, job['id'])
+
+    report = PortfolioReport(title=payload.get('title') or "Facade Portfolio Recommendation")
+    report.add_summary([
+        {
+            'name': name,
+            'material_type': top[0]['material_type'],
+            'score': round(top[0]['score'], 2),
+            'thermal': round(top[0]['thermal'], 2),
+            'cost': round(top[0]['cost'], 2)
+        }
+        for name, top in scored
+    ])
+
+    # Charts are rendered one project at a time and released once placed
+    for i, (name, top) in enumerate(scored):
+        report.add_project(
+            name, top,
+            suitability_score=round(top[0]['score'], 2),
+            thermal_perf=round(top[0]['thermal'], 2),
+            cost_est=round(top[0]['cost'], 2),
+            chart_img=multi_material_comparison_chart(top)
+        )
+        jobs.update_progress(conn, job['id'], i + 1)
+
+    # Glass ranking does not depend on the project, so it is computed and written once
+    tmp_path = output_path + ".tmp"
+    report.save(tmp_path, glass_recommendations=main.top_glass_recommendations())
+    os.replace(tmp_path, output_path)
+    return output_path
+
+
+def run_job(job, conn, jobs_dir=jobs.JOBS_DIR):
+    output_path = os.path.join(jobs_dir, f"{job['id']}.pdf")
+    try:
+        build_portfolio_report(job, conn, output_path)
+    except Exception as e:
+        print(f"[ERROR] Report job {job['id']} failed: {e}")
+        traceback.print_exc()
+        jobs.fail_job(conn, job['id'], str(e))
+        return False
+    jobs.complete_job(conn, job['id'], output_path)
+    print(f"[INFO] Report job {job['id']} done → {output_path}")
+    return True
+
+
+def worker_loop(db_path=jobs.DB_PATH, poll_interval=POLL_INTERVAL, max_jobs=None):
+    """Claim and run jobs until max_jobs have been processed (forever if None)."""
+    warnings.filterwarnings("ignore")
+    import main  # noqa: F401 - load models before the first job is claimed
+
+    conn = jobs.connect(db_path)
+    processed = 0
+    last_stale_check = 0
+    try:
+        while max_jobs is None or processed < max_jobs:
+            if time.time() - last_stale_check > poll_interval * 30:
+                requeued, failed = jobs.requeue_stale_jobs(conn, HEARTBEAT_TIMEOUT, MAX_ATTEMPTS)
+                if requeued or failed:
+                    print(f"[WARN] Recovered orphaned report jobs: {requeued} requeued, {failed} failed")
+                last_stale_check = time.time()
+
+            job = jobs.claim_next_job(conn)
+            if job is None:
+                time.sleep(poll_interval)
+                continue
+            print(f"[INFO] Worker {os.getpid()} running report job {job['id']}")
+            run_job(job, conn, jobs_dir=os.path.dirname(db_path) or ".")
+            processed += 1
+    finally:
+        conn.close()
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Run background report workers")
+    parser.add_argument('--workers', type=int, default=2, help="Worker processes")
+    parser.add_argument('--poll-interval', type=float, default=POLL_INTERVAL,
+                        help="Seconds between queue checks when idle")
+    args = parser.parse_args(argv)
+
+    jobs.connect().close()
+    processes = [
+        multiprocessing.Process(target=worker_loop,
+                                kwargs={'poll_interval': args.poll_interval}, daemon=True)
+        for _ in range(args.workers)
+    ]
+    for p in processes:
+        p.start()
+    print(f"[INFO] Started {args.workers} report worker(s)")
+    try:
+        for p in processes:
+            p.join()
+    except KeyboardInterrupt:
+        for p in processes:
+            p.terminate()
+
+
+if __name__ == "__main__":
+    main_cli()
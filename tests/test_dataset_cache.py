@@ -0,0 +1,47 @@
+import os
+
+import pandas as pd
+
+from model_training import dataset_cache
+from model_training.dataset_cache import load_csv_cached
+
+CSV = "material_id,material_type,cost_per_sqm\nM1,Glass,120.5\nM2,,80\nM3,Stone,95.25\n"
+
+
+def _write_csv(path, text):
+    with open(path, 'w') as f:
+        f.write(text)
+
+
+def test_cache_is_rebuilt_when_source_changes(tmp_path, monkeypatch):
+    monkeypatch.setenv('DATASET_CACHE_DIR', str(tmp_path / "cache"))
+    path = str(tmp_path / "materials.csv")
+    _write_csv(path, CSV)
+    pd.testing.assert_frame_equal(load_csv_cached(path), pd.read_csv(path))
+
+    _write_csv(path, CSV.replace("120.5", "130.0") + "M4,Metal,60\n")
+    # Bump mtime so the size/mtime shortcut can't mask the change
+    mtime = os.stat(path).st_mtime_ns
+    os.utime(path, ns=(mtime, mtime + 10**9))
+
+    df = load_csv_cached(path)
+    pd.testing.assert_frame_equal(df, pd.read_csv(path))
+    assert df['cost_per_sqm'].tolist() == [130.0, 80.0, 95.25, 60.0]
+
+
+def test_uncached_path_matches_read_csv(tmp_path, monkeypatch):
+    path = str(tmp_path / "materials.csv")
+    _write_csv(path, CSV)
+
+    def read_only(*args, **kwargs):
+        raise PermissionError(30, "Read-only file system")
+
+    monkeypatch.setenv('DATASET_CACHE_DIR', str(tmp_path / "cache"))
+    monkeypatch.setattr(dataset_cache.os, 'makedirs', read_only)
+
+    pd.testing.assert_frame_equal(load_csv_cached(path), pd.read_csv(path))
+
+    lowered = load_csv_cached(path, lowercase=['material_type'])
+    assert lowered['material_type'].tolist()[::2] == ['glass', 'stone']
+    assert pd.isna(lowered['material_type'][1])
+    assert lowered['material_id'].tolist() == ['M1', 'M2', 'M3']
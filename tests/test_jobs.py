@@ -0,0 +1,54 @@
+import multiprocessing
+import time
+
+from reports import jobs
+
+
+def _claim_all(db_path):
+    """Worker process: claim jobs until the queue is empty, return their IDs."""
+    conn = jobs.connect(db_path)
+    claimed = []
+    try:
+        while True:
+            job = jobs.claim_next_job(conn)
+            if job is None:
+                return claimed
+            claimed.append(job['id'])
+    finally:
+        conn.close()
+
+
+def _expire_heartbeat(conn, job_id):
+    conn.execute("UPDATE jobs SET heartbeat_at = ? WHERE id = ?", (time.time() - 3600, job_id))
+
+
+def test_workers_never_claim_the_same_job(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    job_ids = [jobs.submit_job({'n': i}, total=1, db_path=db_path) for i in range(40)]
+
+    with multiprocessing.Pool(4) as pool:
+        claimed = pool.map(_claim_all, [db_path] * 4)
+
+    all_claimed = [job_id for ids in claimed for job_id in ids]
+    assert sorted(all_claimed) == sorted(job_ids)
+
+
+def test_stale_jobs_are_requeued_until_the_attempt_limit(tmp_path):
+    db_path = str(tmp_path / "jobs.db")
+    job_id = jobs.submit_job({}, total=1, db_path=db_path)
+    conn = jobs.connect(db_path)
+    try:
+        assert jobs.claim_next_job(conn)['attempts'] == 1
+        # A job with a fresh heartbeat is left alone
+        assert jobs.requeue_stale_jobs(conn, timeout=60, max_attempts=2) == (0, 0)
+
+        _expire_heartbeat(conn, job_id)
+        assert jobs.requeue_stale_jobs(conn, timeout=60, max_attempts=2) == (1, 0)
+        assert jobs.get_job(job_id, db_path=db_path)['status'] == jobs.STATUS_QUEUED
+
+        assert jobs.claim_next_job(conn)['attempts'] == 2
+        _expire_heartbeat(conn, job_id)
+        assert jobs.requeue_stale_jobs(conn, timeout=60, max_attempts=2) == (0, 1)
+        assert jobs.get_job(job_id, db_path=db_path)['status'] == jobs.STATUS_FAILED
+    finally:
+        conn.close()
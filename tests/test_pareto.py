@@ -0,0 +1,46 @@
+import numpy as np
+
+from model_training.pareto import material_pareto_fronts, pareto_front
+
+
+def _pred(material_id, cost, thermal, score, material_type='glass'):
+    return {'material_id': material_id, 'material_type': material_type,
+            'cost': cost, 'thermal': thermal, 'score': score}
+
+
+def test_pareto_front_2d_and_3d():
+    cost = np.array([1.0, 2.0, 3.0, 2.5])
+    thermal = np.array([3.0, 2.0, 1.0, 2.5])
+    score = np.array([10.0, 10.0, 10.0, 50.0])
+
+    assert pareto_front(cost, thermal).tolist() == [0, 1, 2]
+    assert pareto_front(cost, thermal, -score).tolist() == [0, 1, 2, 3]
+
+
+def test_material_fronts_list_each_material_once():
+    # Catalog rows repeat materials with identical predictions
+    preds = [
+        _pred('M1', 100, 0.5, 80), _pred('M2', 120, 0.3, 85),
+        _pred('M1', 100, 0.5, 80), _pred('M3', 150, 0.9, 70),
+        _pred('M2', 120, 0.3, 85),
+    ]
+
+    front_2d, front_3d = material_pareto_fronts(preds)
+
+    assert [preds[i]['material_id'] for i in front_2d] == ['M1', 'M2']
+    assert [preds[i]['material_id'] for i in front_3d] == ['M1', 'M2']
+
+
+def test_material_fronts_keep_variants_sharing_an_id():
+    # Same material_id, different material and predictions: both can be non-dominated
+    preds = [
+        _pred('M38', 80, 2.5, 60, material_type='composite'),
+        _pred('M38', 92, 1.8, 75, material_type='terracotta'),
+        _pred('M38', 80, 2.5, 60, material_type='composite'),
+        _pred('M1', 100, 2.0, 50),
+    ]
+
+    front_2d, front_3d = material_pareto_fronts(preds)
+
+    assert front_2d.tolist() == [0, 1]
+    assert front_3d.tolist() == [0, 1]
@@ -0,0 +1,61 @@
+import os
+
+import joblib
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from model_training.registry import MODEL_FILES, ModelRegistry, publish_version
+
+
+def _sample_df():
+    return pd.DataFrame({'area': [100.0, 200.0, 300.0, 400.0],
+                         'zone': ['hot', 'cold', 'hot', 'coastal']})
+
+
+def _write_version(models_dir, version, broken=False):
+    """Fit a tiny model set into versions/<version>; broken writes an unloadable cost model."""
+    path = os.path.join(models_dir, "versions", version)
+    os.makedirs(path)
+    df = _sample_df()
+    preprocessor = ColumnTransformer([
+        ('num', StandardScaler(), ['area']),
+        ('cat', OneHotEncoder(handle_unknown='ignore'), ['zone'])
+    ]).fit(df)
+    model = LinearRegression().fit(preprocessor.transform(df), [1.0, 2.0, 3.0, 4.0])
+    for name, filename in MODEL_FILES.items():
+        joblib.dump(preprocessor if name == 'preprocessor' else model, os.path.join(path, filename))
+    if broken:
+        with open(os.path.join(path, MODEL_FILES['cost_model']), 'wb') as f:
+            f.write(b"not a pickle")
+    publish_version(version, manifest_path=os.path.join(models_dir, "manifest.json"),
+                    versions_dir=os.path.join(models_dir, "versions"))
+
+
+def test_broken_version_is_rejected_and_previous_keeps_serving(tmp_path):
+    models_dir = str(tmp_path)
+    _write_version(models_dir, "v1")
+    registry = ModelRegistry(_sample_df(), models_dir=models_dir, poll_interval=0)
+    assert registry.load_initial().version == "v1"
+
+    _write_version(models_dir, "v2", broken=True)
+    # Make sure the manifest change is visible even on coarse-mtime filesystems
+    manifest_path = os.path.join(models_dir, "manifest.json")
+    mtime = os.stat(manifest_path).st_mtime_ns
+    os.utime(manifest_path, ns=(mtime, mtime + 10**9))
+
+    assert registry.check_for_update() is False
+    assert registry.current().version == "v1"
+    assert "v2" in registry.failed_versions
+
+
+def test_startup_falls_back_to_last_loadable_version(tmp_path):
+    models_dir = str(tmp_path)
+    _write_version(models_dir, "v1")
+    _write_version(models_dir, "v2", broken=True)
+
+    registry = ModelRegistry(_sample_df(), models_dir=models_dir, poll_interval=0)
+
+    assert registry.load_initial().version == "v1"
+    assert registry.failed_versions == {"v2"}
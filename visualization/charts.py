@@ -4,9 +4,11 @@ import matplotlib.pyplot as plt
 import seaborn as sns
 import io
 import numpy as np
+from monitoring.timing import timed
 
 sns.set(style="whitegrid")  # clean white background with grid
 
+@timed("chart_bar")
 def bar_chart_top_materials(top_materials):
     """
     Generates a grouped bar chart comparing Suitability, Thermal, and Cost for top materials.
@@ -50,22 +52,35 @@ def bar_chart_top_materials(top_materials):
     return buf  # return BytesIO directly for PDF export
 
 
-def scatter_cost_vs_thermal(materials_data):
+@timed("chart_scatter")
+def scatter_cost_vs_thermal(materials_data, pareto_front=None):
     """
     Generates a scatter plot for Cost vs Thermal performance.
+    If pareto_front (list of non-dominated materials) is given, those points are
+    highlighted and joined as a step line, and only they are labelled so the
+    chart stays readable and fast for large catalogs.
     Returns the chart as a BytesIO object.
     """
     fig, ax = plt.subplots(figsize=(6,4))
 
     costs = [m.get('cost', 0) for m in materials_data]
     thermal = [m.get('thermal', 0) for m in materials_data]
-    labels = [m['material_type'] for m in materials_data]
 
-    ax.scatter(thermal, costs, color='purple', s=100)
-
-    for i, label in enumerate(labels):
-        ax.annotate(label, (thermal[i], costs[i]), textcoords="offset points", xytext=(7,5),
-                    ha='left', fontsize=9)
+    ax.scatter(thermal, costs, color='purple', s=100 if pareto_front is None else 40,
+               alpha=1.0 if pareto_front is None else 0.5)
+
+    labelled = materials_data if pareto_front is None else pareto_front
+    if pareto_front:
+        front = sorted(pareto_front, key=lambda m: m.get('thermal', 0))
+        front_thermal = [m.get('thermal', 0) for m in front]
+        front_costs = [m.get('cost', 0) for m in front]
+        ax.step(front_thermal, front_costs, where='post', color='crimson', linewidth=1.5)
+        ax.scatter(front_thermal, front_costs, color='crimson', s=100, label='Pareto front')
+        ax.legend(loc='upper right', fontsize=8)
+
+    for m in labelled:
+        ax.annotate(m['material_type'], (m.get('thermal', 0), m.get('cost', 0)),
+                    textcoords="offset points", xytext=(7,5), ha='left', fontsize=9)
 
     ax.set_xlabel('Thermal Performance')
     ax.set_ylabel('Cost')
@@ -5,9 +5,11 @@ import seaborn as sns
 import pandas as pd
 import io
 import numpy as np
+from monitoring.timing import timed
 
 sns.set(style="whitegrid")
 
+@timed("chart_multi")
 def multi_material_comparison_chart(top_materials):
     """
     Generates a grouped bar chart comparing Suitability, Thermal, and Cost for top materials.
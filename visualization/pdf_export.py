@@ -1,19 +1,21 @@
 from fpdf import FPDF
 import tempfile
 import os
+from monitoring.timing import timed
 
-def export_recommendations_pdf(top_materials, suitability_score, thermal_perf, cost_est,
-                               chart_img=None, glass_recommendations=None,
-                               output_path='recommendation.pdf'):
-    pdf = FPDF()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=15)
 
-    # ------------------------
-    # Phase 2: Top Materials
-    # ------------------------
+def _latin1(text):
+    """fpdf 1.7 core fonts only encode latin-1; replace anything else with '?'."""
+    return str(text).encode('latin-1', 'replace').decode('latin-1')
+
+
+# ------------------------
+# Section writers (shared by single and portfolio reports)
+# ------------------------
+def _write_material_section(pdf, top_materials, suitability_score, thermal_perf, cost_est,
+                            title="Facade Material Recommendation"):
     pdf.set_font("Arial", 'B', 16)
-    pdf.cell(0, 10, "Facade Material Recommendation", ln=True, align='C')
+    pdf.cell(0, 10, title, ln=True, align='C')
     pdf.ln(10)
 
     pdf.set_font("Arial", '', 12)
@@ -36,79 +38,176 @@ def export_recommendations_pdf(top_materials, suitability_score, thermal_perf, c
             pdf.cell(top_material_widths[i], 10, str(item), 1, align='C')
         pdf.ln()
 
-    # Insert chart image if provided
-    if chart_img:
-        chart_img.seek(0)
-        temp_path = None
-        try:
+
+def _write_chart(pdf, chart_img, image_path=None):
+    """
+    Insert a PNG chart (BytesIO). fpdf 1.7 only reads images from disk, so the
+    chart is written to image_path (kept for the caller to remove) or a temp file.
+    """
+    chart_img.seek(0)
+    temp_path = image_path
+    try:
+        if temp_path is None:
             with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as temp_file:
-                temp_file.write(chart_img.read())
                 temp_path = temp_file.name
-            pdf.ln(10)
-            pdf.image(temp_path, x=30, w=150)
-        finally:
-            if temp_path and os.path.exists(temp_path):
-                os.remove(temp_path)
+        with open(temp_path, 'wb') as f:
+            f.write(chart_img.read())
+        pdf.ln(10)
+        pdf.image(temp_path, x=30, w=150)
+    finally:
+        if image_path is None and temp_path and os.path.exists(temp_path):
+            os.remove(temp_path)
+
+
+def _write_glass_section(pdf, glass_recommendations):
+    pdf.add_page()
+    pdf.set_font("Arial", 'B', 16)
+    pdf.cell(0, 10, "Top Glass Options (Phase 1)", ln=True, align='C')
+    pdf.ln(5)
+
+    first_cols = ["Name", "Score", "U-Value", "SHGC", "VLT", "Acoustic", "Fire Rating"]
+    second_cols = ["Cost", "Thickness", "Maintenance", "Solar Coating", "Impact", "Environmental"]
+    first_col_widths = [40, 20, 20, 20, 20, 25, 25]
+    second_col_widths = [25, 20, 25, 25, 25, 30]
+
+    # Helper to print centered table
+    def print_centered_table(columns, col_widths, data_rows, pdf):
+        total_width = sum(col_widths)
+        x_start = (pdf.w - total_width) / 2
+        # Header
+        pdf.set_font("Arial", 'B', 10)
+        for i, col in enumerate(columns):
+            pdf.set_x(x_start + sum(col_widths[:i]))
+            pdf.cell(col_widths[i], 8, col, border=1, align='C')
+        pdf.ln()
+        # Rows
+        pdf.set_font("Arial", '', 9)
+        for row in data_rows:
+            for i, item in enumerate(row):
+                pdf.set_x(x_start + sum(col_widths[:i]))
+                pdf.cell(col_widths[i], 6, str(item), border=1, align='C')
+            pdf.ln()
+        pdf.ln(5)
+
+    # Prepare data for first table
+    first_data = []
+    for g in glass_recommendations:
+        first_data.append([
+            g.get("material_name", ""),
+            round(g.get("score", 0),2),
+            g.get("material_u_value", ""),
+            g.get("material_shgc", ""),
+            g.get("material_vlt_percent", ""),
+            g.get("acoustic_rating_rw", ""),
+            g.get("fire_rating", "")
+        ])
+    print_centered_table(first_cols, first_col_widths, first_data, pdf)
+
+    # Prepare data for second table
+    second_data = []
+    for g in glass_recommendations:
+        second_data.append([
+            round(g.get("cost_per_sqm", 0),2),
+            g.get("thickness_mm", ""),
+            g.get("maintenance_freq_per_year", ""),
+            g.get("solar_control_coating", ""),
+            g.get("impact_resistance", ""),
+            g.get("environmental_suitability", "")
+        ])
+    print_centered_table(second_cols, second_col_widths, second_data, pdf)
+
+
+@timed("pdf_export")
+def export_recommendations_pdf(top_materials, suitability_score, thermal_perf, cost_est,
+                               chart_img=None, glass_recommendations=None,
+                               output_path='recommendation.pdf'):
+    pdf = FPDF()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+
+    # ------------------------
+    # Phase 2: Top Materials
+    # ------------------------
+    _write_material_section(pdf, top_materials, suitability_score, thermal_perf, cost_est)
+
+    # Insert chart image if provided
+    if chart_img:
+        _write_chart(pdf, chart_img)
 
     # ------------------------
     # Phase 1: Glass Recommendations (Centered)
     # ------------------------
     if glass_recommendations:
-        pdf.add_page()
-        pdf.set_font("Arial", 'B', 16)
-        pdf.cell(0, 10, "Top Glass Options (Phase 1)", ln=True, align='C')
-        pdf.ln(5)
-
-        first_cols = ["Name", "Score", "U-Value", "SHGC", "VLT", "Acoustic", "Fire Rating"]
-        second_cols = ["Cost", "Thickness", "Maintenance", "Solar Coating", "Impact", "Environmental"]
-        first_col_widths = [40, 20, 20, 20, 20, 25, 25]
-        second_col_widths = [25, 20, 25, 25, 25, 30]
-
-        # Helper to print centered table
-        def print_centered_table(columns, col_widths, data_rows, pdf):
-            total_width = sum(col_widths)
-            x_start = (pdf.w - total_width) / 2
-            # Header
-            pdf.set_font("Arial", 'B', 10)
-            for i, col in enumerate(columns):
-                pdf.set_x(x_start + sum(col_widths[:i]))
-                pdf.cell(col_widths[i], 8, col, border=1, align='C')
-            pdf.ln()
-            # Rows
-            pdf.set_font("Arial", '', 9)
-            for row in data_rows:
-                for i, item in enumerate(row):
-                    pdf.set_x(x_start + sum(col_widths[:i]))
-                    pdf.cell(col_widths[i], 6, str(item), border=1, align='C')
-                pdf.ln()
-            pdf.ln(5)
-
-        # Prepare data for first table
-        first_data = []
-        for g in glass_recommendations:
-            first_data.append([
-                g.get("material_name", ""),
-                round(g.get("score", 0),2),
-                g.get("material_u_value", ""),
-                g.get("material_shgc", ""),
-                g.get("material_vlt_percent", ""),
-                g.get("acoustic_rating_rw", ""),
-                g.get("fire_rating", "")
-            ])
-        print_centered_table(first_cols, first_col_widths, first_data, pdf)
-
-        # Prepare data for second table
-        second_data = []
-        for g in glass_recommendations:
-            second_data.append([
-                round(g.get("cost_per_sqm", 0),2),
-                g.get("thickness_mm", ""),
-                g.get("maintenance_freq_per_year", ""),
-                g.get("solar_control_coating", ""),
-                g.get("impact_resistance", ""),
-                g.get("environmental_suitability", "")
-            ])
-        print_centered_table(second_cols, second_col_widths, second_data, pdf)
+        _write_glass_section(pdf, glass_recommendations)
 
     pdf.output(output_path)
     return output_path
+
+
+# ------------------------
+# Multi-project (portfolio) report
+# ------------------------
+class PortfolioReport:
+    """
+    One consolidated PDF for many projects, built page by page.
+
+    Fonts and page setup are configured once and projects are added one at a
+    time. Each chart's PNG file is removed once placed, but fpdf 1.7 keeps the
+    image data (in FPDF.images) and every page until output(), so memory grows
+    with the number of projects. The glass section is the same for all
+    projects and is written once at the end.
+    """
+
+    def __init__(self, title="Facade Portfolio Recommendation"):
+        self.pdf = FPDF()
+        self.pdf.set_auto_page_break(auto=True, margin=15)
+        self.title = _latin1(title)
+        self._image_dir = tempfile.mkdtemp(prefix="portfolio-")
+        self._image_count = 0
+
+    def add_summary(self, rows):
+        """
+        Overview table, one row per project.
+        rows: list of dicts with name, material_type, score, thermal and cost.
+        """
+        self.pdf.add_page()
+        self.pdf.set_font("Arial", 'B', 18)
+        self.pdf.cell(0, 12, self.title, ln=True, align='C')
+        self.pdf.ln(5)
+
+        widths = [60, 40, 25, 25, 40]
+        self.pdf.set_font("Arial", 'B', 10)
+        for i, col in enumerate(["Project", "Best Material", "Score", "Thermal", "Cost"]):
+            self.pdf.cell(widths[i], 8, col, 1, align='C')
+        self.pdf.ln()
+        self.pdf.set_font("Arial", '', 9)
+        for row in rows:
+            for i, item in enumerate([row['name'], row['material_type'], row['score'],
+                                      row['thermal'], row['cost']]):
+                self.pdf.cell(widths[i], 7, _latin1(item)[:35], 1, align='C')
+            self.pdf.ln()
+
+    def add_project(self, name, top_materials, suitability_score, thermal_perf, cost_est,
+                    chart_img=None):
+        self.pdf.add_page()
+        _write_material_section(self.pdf, top_materials, suitability_score, thermal_perf,
+                                cost_est, title=_latin1(f"{name}: Facade Material Recommendation"))
+        if chart_img:
+            # fpdf caches images by file name, so each chart needs a distinct path
+            self._image_count += 1
+            image_path = os.path.join(self._image_dir, f"chart_{self._image_count}.png")
+            _write_chart(self.pdf, chart_img, image_path=image_path)
+            os.remove(image_path)
+
+    @timed("pdf_portfolio_save")
+    def save(self, output_path, glass_recommendations=None):
+        """Write the glass section (once) and the finished PDF, then clean up."""
+        try:
+            if glass_recommendations:
+                _write_glass_section(self.pdf, glass_recommendations)
+            self.pdf.output(output_path)
+        finally:
+            for name in os.listdir(self._image_dir):
+                os.remove(os.path.join(self._image_dir, name))
+            os.rmdir(self._image_dir)
+        return output_path